@@ -16,3 +16,12 @@ from pump_fun_sell import sell
 # if u don't need jito, u should modify the code and delete jito logic
 # current slippage is 30, u should set it less, if slippage 5 for example it often gives u unsuccess txs, it's better to use private nodes like helius or quicknode for example
 # test this funcs before use them in ur bots
+
+# router.trade("mint_address", "buy", sol_in = 0.1) / router.trade("mint_address", "sell", sell_percentage = 50)
+# picks the bonding curve or jupiter by itself, so u don't need to retry by hand when the token graduates
+
+# runner.run(["mint_1", "mint_2", ...], my_strategy) - one thread reads all curves, my_strategy(coin_data) runs in
+# several processes and returns None or router.trade kwargs like {"mint_str": ..., "side": "buy", "sol_in": 0.1}
+
+# router.submit_orders([{"mint_str": ..., "side": "buy", "sol_in": 0.1}, ...]) - builds all curve orders, simulates them
+# in one request and sends only the ones that pass
@@ -1,29 +1,45 @@
+from typing import Dict, List, Optional
 from solders.pubkey import Pubkey  # type: ignore
 from spl.token.instructions import get_associated_token_address
 from construct import Padding, Struct, Int64ul, Flag
 from config import client
-from constants import PUMP_FUN_PROGRAM
+from constants import PUMP_FUN_PROGRAM, TOKEN_DECIMALS
+from mint_cache import mint_cache
+from scheduler import scheduler, SchedulerError, RPC_ENDPOINT, LANE_CURVE
 
-def get_virtual_reserves(bonding_curve: Pubkey):
-    bonding_curve_struct = Struct(
-        Padding(8),
-        "virtualTokenReserves" / Int64ul,
-        "virtualSolReserves" / Int64ul,
-        "realTokenReserves" / Int64ul,
-        "realSolReserves" / Int64ul,
-        "tokenTotalSupply" / Int64ul,
-        "complete" / Flag
-    )
-    
+bonding_curve_struct = Struct(
+    Padding(8),
+    "virtualTokenReserves" / Int64ul,
+    "virtualSolReserves" / Int64ul,
+    "realTokenReserves" / Int64ul,
+    "realSolReserves" / Int64ul,
+    "tokenTotalSupply" / Int64ul,
+    "complete" / Flag
+)
+
+def get_virtual_reserves_with_slot(bonding_curve: Pubkey):
     try:
-        account_info = client.get_account_info(bonding_curve)
+        account_info = scheduler.call(
+            RPC_ENDPOINT, LANE_CURVE, client.get_account_info, bonding_curve,
+            coalesce_key=("getAccountInfo", str(bonding_curve))
+        )
         data = account_info.value.data
         parsed_data = bonding_curve_struct.parse(data)
-        return parsed_data
+        return parsed_data, account_info.context.slot
+    except SchedulerError:
+        raise
     except Exception:
-        return None
+        return None, None
+
+def get_virtual_reserves(bonding_curve: Pubkey):
+    parsed_data, _ = get_virtual_reserves_with_slot(bonding_curve)
+    return parsed_data
 
 def derive_bonding_curve_accounts(mint_str: str):
+    cached = mint_cache.get(mint_str)
+    if cached is not None:
+        return Pubkey.from_string(cached["bonding_curve"]), Pubkey.from_string(cached["associated_bonding_curve"])
+
     try:
         mint = Pubkey.from_string(mint_str)
         bonding_curve, _ = Pubkey.find_program_address(
@@ -31,35 +47,113 @@ def derive_bonding_curve_accounts(mint_str: str):
             PUMP_FUN_PROGRAM
         )
         associated_bonding_curve = get_associated_token_address(bonding_curve, mint)
-        return bonding_curve, associated_bonding_curve
     except Exception:
         return None, None
 
+    mint_cache.update(
+        mint_str,
+        bonding_curve=str(bonding_curve),
+        associated_bonding_curve=str(associated_bonding_curve),
+        decimals=TOKEN_DECIMALS
+    )
+    return bonding_curve, associated_bonding_curve
+
+def _coin_data_from_cache(record: dict):
+    return {
+        "mint": record["mint"],
+        "bonding_curve": record["bonding_curve"],
+        "associated_bonding_curve": record["associated_bonding_curve"],
+        "virtual_token_reserves": record["virtual_token_reserves"],
+        "virtual_sol_reserves": record["virtual_sol_reserves"],
+        "token_total_supply": record["token_total_supply"],
+        "real_token_reserves": record["real_token_reserves"],
+        "real_sol_reserves": record["real_sol_reserves"],
+        "complete": record["complete"],
+        "slot": record["slot"]
+    }
+
+def get_cached_coin_data(mint_str: str):
+    """Last known coin data for the mint, without touching the RPC."""
+    record = mint_cache.get(mint_str)
+    if record is None or record["virtual_token_reserves"] is None:
+        return None
+    return _coin_data_from_cache(record)
+
 def get_coin_data(mint_str: str):
+    # The curve of a graduated token is frozen, so the cached state is final.
+    cached = get_cached_coin_data(mint_str)
+    if cached is not None and cached["complete"]:
+        return cached
+
     bonding_curve, associated_bonding_curve = derive_bonding_curve_accounts(mint_str)
     if bonding_curve is None or associated_bonding_curve is None:
         return None
 
-    virtual_reserves = get_virtual_reserves(bonding_curve)
+    virtual_reserves, slot = get_virtual_reserves_with_slot(bonding_curve)
     if virtual_reserves is None:
         return None
 
+    return _record_virtual_reserves(mint_str, virtual_reserves, slot)
+
+def _record_virtual_reserves(mint_str: str, virtual_reserves, slot):
     try:
         virtual_token_reserves = int(virtual_reserves.virtualTokenReserves)
         virtual_sol_reserves = int(virtual_reserves.virtualSolReserves)
         token_total_supply = int(virtual_reserves.tokenTotalSupply)
         real_token_reserves = int(virtual_reserves.realTokenReserves)
+        real_sol_reserves = int(virtual_reserves.realSolReserves)
         complete = bool(virtual_reserves.complete)
-        
-        return {
-            "mint": mint_str,
-            "bonding_curve": str(bonding_curve),
-            "associated_bonding_curve": str(associated_bonding_curve),
-            "virtual_token_reserves": virtual_token_reserves,
-            "virtual_sol_reserves": virtual_sol_reserves,
-            "token_total_supply": token_total_supply,
-            "real_token_reserves": real_token_reserves,
-            "complete": complete
-        }
     except Exception:
-        return None
\ No newline at end of file
+        return None
+
+    record = mint_cache.update(
+        mint_str,
+        slot=slot,
+        virtual_token_reserves=virtual_token_reserves,
+        virtual_sol_reserves=virtual_sol_reserves,
+        real_token_reserves=real_token_reserves,
+        real_sol_reserves=real_sol_reserves,
+        token_total_supply=token_total_supply,
+        complete=complete
+    )
+    return _coin_data_from_cache(record)
+
+MAX_MULTIPLE_ACCOUNTS = 100  # getMultipleAccounts limit per request
+
+def get_many_coin_data(mint_strs: List[str]) -> Dict[str, Optional[dict]]:
+    """get_coin_data for many mints, reading the open curves with getMultipleAccounts."""
+    results = {}
+    pending = []
+    for mint_str in mint_strs:
+        cached = get_cached_coin_data(mint_str)
+        if cached is not None and cached["complete"]:
+            results[mint_str] = cached
+            continue
+        bonding_curve, _ = derive_bonding_curve_accounts(mint_str)
+        if bonding_curve is None:
+            results[mint_str] = None
+        else:
+            pending.append((mint_str, bonding_curve))
+
+    for i in range(0, len(pending), MAX_MULTIPLE_ACCOUNTS):
+        chunk = pending[i:i + MAX_MULTIPLE_ACCOUNTS]
+        try:
+            response = scheduler.call(
+                RPC_ENDPOINT, LANE_CURVE, client.get_multiple_accounts, [bonding_curve for _, bonding_curve in chunk]
+            )
+        except SchedulerError:
+            raise
+        except Exception:
+            for mint_str, _ in chunk:
+                results[mint_str] = None
+            continue
+
+        slot = response.context.slot
+        for (mint_str, _), account in zip(chunk, response.value):
+            try:
+                virtual_reserves = bonding_curve_struct.parse(account.data)
+            except Exception:
+                results[mint_str] = None
+                continue
+            results[mint_str] = _record_virtual_reserves(mint_str, virtual_reserves, slot)
+    return results
\ No newline at end of file
@@ -11,5 +11,8 @@ PUMP_FUN_PROGRAM = Pubkey.from_string("6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF
 JITOTIP_ACCOUNT = Pubkey.from_string("3AVi9Tg9Uo68tJfuvoKvqKNWKkC5wPdSSdeBnizKZ6jT")
 
 LAMPORTS_PER_SOL = 1_000_000_000
+TOKEN_DECIMALS = 6
+INITIAL_REAL_TOKEN_RESERVES = 793_100_000_000_000
+FEE_BASIS_POINTS = 100
 UNIT_PRICE =  1_000_000
 UNIT_BUDGET =  5_000_000 
\ No newline at end of file
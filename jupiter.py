@@ -9,6 +9,7 @@ from solana.rpc.commitment import Processed
 from solana.rpc.types import TxOpts
 from utils import confirm_txn, get_token_balance_lamports
 from config import payer_keypair, RPC
+from scheduler import scheduler, SchedulerError, JUPITER_ENDPOINT, RPC_ENDPOINT, LANE_CURVE, LANE_SUBMIT
 
 SOL = "So11111111111111111111111111111111111111112"
 
@@ -23,10 +24,10 @@ def get_quote(input_mint: str, output_mint: str, amount: int, slippage_bps: int)
             'onlyDirectRoutes': 'true'
         }
         headers = {'Accept': 'application/json'}
-        response = requests.get(url, headers=headers, params=params)
+        response = scheduler.get(JUPITER_ENDPOINT, LANE_CURVE, url, headers=headers, params=params)
         response.raise_for_status()
         return response.json()
-    except requests.RequestException as e:
+    except (requests.RequestException, SchedulerError) as e:
         print(f"Error in get_quote: {e}")
         return None
 
@@ -43,7 +44,7 @@ def get_swap(user_public_key: str, quote_response: Dict[str, Any]) -> Optional[D
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         }
-        response = requests.post(url, headers=headers, data=payload)
+        response = scheduler.post(JUPITER_ENDPOINT, LANE_SUBMIT, url, headers=headers, data=payload)
         response.raise_for_status()
         return response.json()
     except requests.RequestException as e:
@@ -51,12 +52,16 @@ def get_swap(user_public_key: str, quote_response: Dict[str, Any]) -> Optional[D
         if e.response is not None:
             print("Response text:", e.response.text)  # <-- ВЫВОД ДЕТАЛЕЙ
         return None
+    except SchedulerError as e:
+        print(f"Error in get_swap: {e}")
+        return None
 
-def swap(input_mint: str, output_mint: str, amount_lamports: int, slippage_bps: int) -> bool:
+def swap(input_mint: str, output_mint: str, amount_lamports: int, slippage_bps: int, quote_response: Optional[Dict[str, Any]] = None) -> bool:
     client = Client(RPC)
     pub_key_str = str(payer_keypair.pubkey())
     
-    quote_response = get_quote(input_mint, output_mint, amount_lamports, slippage_bps)
+    if quote_response is None:
+        quote_response = get_quote(input_mint, output_mint, amount_lamports, slippage_bps)
     if not quote_response:
         print("No quote response.")
         return False
@@ -76,7 +81,8 @@ def swap(input_mint: str, output_mint: str, amount_lamports: int, slippage_bps:
     opts = TxOpts(skip_preflight=False, preflight_commitment=Processed)
 
     try:
-        txn_sig = client.send_raw_transaction(
+        txn_sig = scheduler.call(
+            RPC_ENDPOINT, LANE_SUBMIT, client.send_raw_transaction,
             txn=bytes(signed_txn), opts=opts
         ).value
         print("Transaction Signature:", txn_sig)
@@ -102,10 +108,14 @@ def sell(token_address: str, percentage: int = 100, slippage: int = 5) -> bool:
         print("Percentage must be between 1 and 100.")
         return False
     
-    token_balance = get_token_balance_lamports(token_address)
+    try:
+        token_balance = get_token_balance_lamports(token_address)
+    except SchedulerError as e:
+        print(f"Failed to read token balance: {e}")
+        return False
     print("Token Balance:", token_balance)    
     
-    if token_balance == 0:
+    if not token_balance:
         print("No token balance available to sell.")
         return False
     
@@ -0,0 +1,209 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Dict, Optional
+
+CACHE_PATH = os.environ.get("PF_MINT_CACHE", "mint_cache.sqlite3")
+FLUSH_INTERVAL = 0.5  # seconds between write-behind flushes
+
+FIELDS = (
+    "mint",
+    "bonding_curve",
+    "associated_bonding_curve",
+    "decimals",
+    "complete",
+    "slot",
+    "virtual_token_reserves",
+    "virtual_sol_reserves",
+    "real_token_reserves",
+    "real_sol_reserves",
+    "token_total_supply",
+    "updated_at",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mints (
+    mint TEXT PRIMARY KEY,
+    bonding_curve TEXT NOT NULL,
+    associated_bonding_curve TEXT NOT NULL,
+    decimals INTEGER,
+    complete INTEGER NOT NULL DEFAULT 0,
+    slot INTEGER,
+    virtual_token_reserves INTEGER,
+    virtual_sol_reserves INTEGER,
+    real_token_reserves INTEGER,
+    real_sol_reserves INTEGER,
+    token_total_supply INTEGER,
+    updated_at REAL
+)
+"""
+
+# Several processes may share the file, so the guards of MintCache.update are
+# repeated here: rows only move forward in slot and never lose `complete`.
+UPSERT = (
+    f"INSERT INTO mints ({', '.join(FIELDS)}) VALUES ({', '.join('?' for _ in FIELDS)}) "
+    "ON CONFLICT(mint) DO UPDATE SET "
+    + ", ".join(f"{f} = excluded.{f}" for f in FIELDS if f not in ("mint", "complete"))
+    + ", complete = MAX(mints.complete, excluded.complete) "
+    "WHERE mints.slot IS NULL OR excluded.slot >= mints.slot"
+)
+
+
+class MintCache:
+    """
+    Persistent per-mint store: derived accounts, decimals, curve completion
+    and the last seen slot/reserves.
+
+    Records are read from SQLite on first access and kept in memory; updates
+    land in memory immediately and are written to disk by a background thread.
+    Only the process that created the cache touches the file: in a forked
+    child it stays in memory.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, flush_interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._records: Optional[Dict[str, dict]] = None
+        self._dirty: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # keeps batches committing in order
+        self._wake = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self._persist = True
+        if hasattr(os, "register_at_fork"):
+            reset = weakref.WeakMethod(self._reset_after_fork)
+            os.register_at_fork(after_in_child=lambda: reset() and reset()())
+
+    def _reset_after_fork(self) -> None:
+        # The fork may have caught the writer thread inside SQLite, leaving its
+        # state unusable in the child, so the child never opens the file. The
+        # parent still owns and flushes the pending records.
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._writer = None
+        self._dirty = {}
+        self._persist = False
+        if self._records is None:
+            self._records = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(SCHEMA)
+        return conn
+
+    def _load(self) -> Dict[str, dict]:
+        if self._records is not None:
+            return self._records
+        with self._lock:
+            if self._records is None:
+                records = {}
+                try:
+                    conn = self._connect()
+                    try:
+                        rows = conn.execute(f"SELECT {', '.join(FIELDS)} FROM mints").fetchall()
+                    finally:
+                        conn.close()
+                    for row in rows:
+                        record = dict(zip(FIELDS, row))
+                        record["complete"] = bool(record["complete"])
+                        records[record["mint"]] = record
+                except sqlite3.Error as e:
+                    print(f"Failed to load mint cache: {e}")
+                self._records = records
+        return self._records
+
+    def get(self, mint_str: str) -> Optional[dict]:
+        record = self._load().get(mint_str)
+        return dict(record) if record is not None else None
+
+    def update(self, mint_str: str, **fields) -> dict:
+        records = self._load()
+        with self._lock:
+            record = records.get(mint_str)
+            if record is None:
+                record = {field: None for field in FIELDS}
+                record["mint"] = mint_str
+                record["complete"] = False
+                records[mint_str] = record
+            slot = fields.get("slot")
+            if slot is not None and record["slot"] is not None and slot < record["slot"]:
+                # An older read must not overwrite newer reserves.
+                fields = {k: v for k, v in fields.items()
+                          if k in ("bonding_curve", "associated_bonding_curve", "decimals")}
+            was_complete = bool(record["complete"])
+            record.update(fields)
+            # A completed curve never reopens.
+            record["complete"] = was_complete or bool(record["complete"])
+            record["updated_at"] = time.time()
+            if self._persist:
+                self._dirty[mint_str] = dict(record)
+        self._start_writer()
+        self._wake.set()
+        return dict(record)
+
+    def _start_writer(self) -> None:
+        if self._writer is not None or not self._persist:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="mint-cache-writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+
+    def _write_loop(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            self.flush()
+            time.sleep(self.flush_interval)
+
+    def flush(self) -> None:
+        if not self._persist:
+            return
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                batch = list(self._dirty.values())
+                self._dirty.clear()
+            rows = []
+            for record in batch:
+                if record["bonding_curve"] is None or record["associated_bonding_curve"] is None:
+                    print(f"Dropping mint cache record without derived accounts: {record['mint']}")
+                    continue
+                rows.append(tuple(int(record[f]) if f == "complete" else record[f] for f in FIELDS))
+            if not rows:
+                return
+            try:
+                conn = self._connect()
+                try:
+                    self._write_rows(conn, rows)
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                print(f"Failed to write mint cache: {e}")
+                with self._lock:
+                    for record in batch:
+                        self._dirty.setdefault(record["mint"], record)
+
+    @staticmethod
+    def _write_rows(conn: sqlite3.Connection, rows: list) -> None:
+        try:
+            with conn:
+                conn.executemany(UPSERT, rows)
+        except sqlite3.IntegrityError:
+            # One bad row must not block the rest of the batch.
+            for row in rows:
+                try:
+                    with conn:
+                        conn.execute(UPSERT, row)
+                except sqlite3.IntegrityError as e:
+                    print(f"Dropping mint cache record {row[0]}: {e}")
+
+mint_cache = MintCache()
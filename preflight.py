@@ -0,0 +1,133 @@
+import base64
+from decimal import Decimal
+from typing import List, Optional, Tuple, Union
+
+from solana.transaction import Transaction
+
+from config import RPC
+from constants import FEE_BASIS_POINTS, TOKEN_DECIMALS
+from scheduler import scheduler, RPC_ENDPOINT, LANE_BLOCKHASH
+
+# Rent for a new associated token account, paid by the buyer.
+ATA_RENT_LAMPORTS = 2_039_280
+
+
+class PreflightError(Exception):
+    pass
+
+
+def ui_to_raw_amount(ui_amount: Union[int, float, str], decimals: int = TOKEN_DECIMALS) -> int:
+    """Convert a UI token amount to base units without float rounding errors."""
+    return int(Decimal(str(ui_amount)).scaleb(decimals))
+
+
+def curve_buy_cost(coin_data: dict, amount: int) -> Optional[int]:
+    """Lamports the curve charges for `amount` tokens, fee included."""
+    virtual_token_reserves = coin_data["virtual_token_reserves"]
+    virtual_sol_reserves = coin_data["virtual_sol_reserves"]
+    if amount >= virtual_token_reserves:
+        return None
+    sol_cost = amount * virtual_sol_reserves // (virtual_token_reserves - amount) + 1
+    return sol_cost + sol_cost * FEE_BASIS_POINTS // 10_000
+
+
+def curve_sell_output(coin_data: dict, amount: int) -> int:
+    """Lamports the curve pays out for `amount` tokens, fee deducted."""
+    virtual_token_reserves = coin_data["virtual_token_reserves"]
+    virtual_sol_reserves = coin_data["virtual_sol_reserves"]
+    sol_output = amount * virtual_sol_reserves // (virtual_token_reserves + amount)
+    return sol_output - sol_output * FEE_BASIS_POINTS // 10_000
+
+
+def check_buy(
+    coin_data: dict,
+    amount: int,
+    max_sol_cost: int,
+    creates_token_account: bool = False,
+    sol_balance: Optional[int] = None,
+) -> Optional[str]:
+    """
+    Validate a bonding curve buy against the known curve state.
+    Returns None if the buy should land, otherwise the reason it would fail.
+    """
+    if coin_data["complete"]:
+        return "bonding curve is complete"
+    if amount <= 0:
+        return f"buy amount is {amount}"
+    if amount > coin_data["real_token_reserves"]:
+        return f"buy amount {amount} exceeds real token reserves {coin_data['real_token_reserves']}"
+    cost = curve_buy_cost(coin_data, amount)
+    if cost is None or cost > max_sol_cost:
+        return f"curve cost {cost} exceeds max sol cost {max_sol_cost}"
+    if sol_balance is not None:
+        required = max_sol_cost + (ATA_RENT_LAMPORTS if creates_token_account else 0)
+        if sol_balance < required:
+            return f"sol balance {sol_balance} is below required {required}"
+    return None
+
+
+def check_sell(
+    coin_data: dict,
+    amount: int,
+    min_sol_output: int,
+    token_balance: Optional[int],
+    close_token_account: bool = False,
+) -> Optional[str]:
+    """
+    Validate a bonding curve sell against the known curve state and the raw
+    token balance (None means the token account does not exist).
+    Returns None if the sell should land, otherwise the reason it would fail.
+    """
+    if coin_data["complete"]:
+        return "bonding curve is complete"
+    if token_balance is None:
+        return "token account does not exist"
+    if amount <= 0:
+        return f"sell amount is {amount}"
+    if amount > token_balance:
+        return f"sell amount {amount} exceeds token balance {token_balance}"
+    if close_token_account and amount != token_balance:
+        return "token account can only be closed when the whole balance is sold"
+    sol_output = curve_sell_output(coin_data, amount)
+    if sol_output < min_sol_output:
+        return f"curve output {sol_output} is below min sol output {min_sol_output}"
+    return None
+
+
+def simulate_transactions(txns: List[Transaction]) -> List[Tuple[bool, Optional[object]]]:
+    """
+    Simulate signed transactions in one batched JSON-RPC request.
+    Returns (ok, error) per transaction, in order.
+    """
+    if not txns:
+        return []
+    payload = [
+        {
+            "jsonrpc": "2.0",
+            "id": i,
+            "method": "simulateTransaction",
+            "params": [
+                base64.b64encode(txn.serialize()).decode("utf-8"),
+                {"encoding": "base64", "sigVerify": False, "replaceRecentBlockhash": True, "commitment": "processed"},
+            ],
+        }
+        for i, txn in enumerate(txns)
+    ]
+    try:
+        response = scheduler.post(RPC_ENDPOINT, LANE_BLOCKHASH, RPC, json=payload, headers={"Content-Type": "application/json"})
+        response.raise_for_status()
+        replies = {reply["id"]: reply for reply in response.json()}
+    except Exception as e:
+        return [(False, str(e)) for _ in txns]
+
+    results = []
+    for i in range(len(txns)):
+        reply = replies.get(i)
+        if reply is None:
+            results.append((False, "no simulation result"))
+        elif "error" in reply:
+            results.append((False, reply["error"]))
+        else:
+            err = reply["result"]["value"]["err"]
+            results.append((err is None, err))
+    return results
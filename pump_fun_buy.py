@@ -1,5 +1,3 @@
-import requests
-import base58
 import struct
 from solana.transaction import AccountMeta, Transaction
 from spl.token.instructions import create_associated_token_account, get_associated_token_address, close_account, CloseAccountParams
@@ -9,8 +7,10 @@ from solders.compute_budget import set_compute_unit_limit, set_compute_unit_pric
 from config import payer_keypair, client
 from constants import *
 from solana.rpc.types import TokenAccountOpts, TxOpts
-from utils import get_token_balance, confirm_txn
+from utils import get_sol_balance_lamports, get_token_balance_lamports, confirm_txn, send_jito_bundle
 from coin_data import get_coin_data
+from preflight import PreflightError, check_buy, check_sell, simulate_transactions, ui_to_raw_amount
+from scheduler import scheduler, RPC_ENDPOINT, LANE_BLOCKHASH, LANE_CURVE
 from solders.system_program import TransferParams, transfer
 from typing import Optional, Union
 
@@ -19,106 +19,118 @@ tip_in_sol = 0.00005
 tip_in_lamports = int(tip_in_sol * LAMPORTS_PER_SOL)
 
 
-def buy(mint_str: str, sol_in: float = 0.01, slippage: int = 30, priority_in_lamports: int = 65000 ) -> bool:
-    try:
-        # Получаем данные о токене
+def build_buy_txn(mint_str: str, sol_in: float = 0.01, slippage: int = 30, priority_in_lamports: int = 65000, coin_data: Optional[dict] = None) -> Transaction:
+    """Build and sign a bonding curve buy. Raises PreflightError if it would fail."""
+    # Получаем данные о токене
+    if coin_data is None:
         coin_data = get_coin_data(mint_str)
-        if not coin_data:
-            print("Failed to retrieve coin data...")
-            return False
-        
-        #print(f"Payer key pair {payer_keypair}")
-        owner = payer_keypair.pubkey()
-        mint = Pubkey.from_string(mint_str)
+    if not coin_data:
+        raise PreflightError("failed to retrieve coin data")
+    if coin_data['complete']:
+        raise PreflightError("bonding curve is complete, use jupiter.buy or router.trade")
+    
+    #print(f"Payer key pair {payer_keypair}")
+    owner = payer_keypair.pubkey()
+    mint = Pubkey.from_string(mint_str)
+
+    # Получаем или создаём ATA
+    try:
+        account_data = scheduler.call(
+            RPC_ENDPOINT, LANE_CURVE, client.get_token_accounts_by_owner, owner, TokenAccountOpts(mint),
+            coalesce_key=("getTokenAccountsByOwner", mint_str)
+        )
+        token_account = account_data.value[0].pubkey
+        token_account_instructions = None
+    except IndexError:
+        # Нет ATA - создаём. Ошибки чтения пробрасываем, иначе создадим уже существующий ATA
+        token_account = get_associated_token_address(owner, mint)
+        token_account_instructions = create_associated_token_account(owner, owner, mint)
+
+    # Расчёт параметров свапа
+    virtual_sol_reserves = coin_data['virtual_sol_reserves']
+    virtual_token_reserves = coin_data['virtual_token_reserves']
+    sol_in_lamports = ui_to_raw_amount(sol_in, 9)
+    amount = sol_in_lamports * virtual_token_reserves // virtual_sol_reserves
+    print(f"Amount returned from buy: {amount}")
+
+    max_sol_cost = sol_in_lamports * (100 + slippage) // 100
+    print("Max Sol Cost:", max_sol_cost / LAMPORTS_PER_SOL)
+
+    # Чаевые Jito списываются с того же баланса
+    sol_balance = get_sol_balance_lamports() - tip_in_lamports
+    preflight_error = check_buy(coin_data, amount, max_sol_cost, token_account_instructions is not None, sol_balance)
+    if preflight_error:
+        raise PreflightError(preflight_error)
+    
+    # Настройка аккаунтов для инструкции
+    MINT = Pubkey.from_string(coin_data['mint'])
+    BONDING_CURVE = Pubkey.from_string(coin_data['bonding_curve'])
+    ASSOCIATED_BONDING_CURVE = Pubkey.from_string(coin_data['associated_bonding_curve'])
+    ASSOCIATED_USER = token_account
+    USER = owner
+
+    keys = [
+        AccountMeta(pubkey=GLOBAL, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=FEE_RECIPIENT, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=MINT, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=BONDING_CURVE, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=ASSOCIATED_BONDING_CURVE, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=ASSOCIATED_USER, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=USER, is_signer=True, is_writable=True),
+        AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=TOKEN_PROGRAM, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=RENT, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=EVENT_AUTHORITY, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=PUMP_FUN_PROGRAM, is_signer=False, is_writable=False)
+    ]
+
+    # Формируем инструкцию свапа
+    data = bytearray()
+    data.extend(bytes.fromhex("66063d1201daebea"))
+    data.extend(struct.pack('<Q', amount))
+    data.extend(struct.pack('<Q', max_sol_cost))
+    data = bytes(data)
+    swap_instruction = Instruction(PUMP_FUN_PROGRAM, data, keys)
+
+    # Создаем транзакцию, подписываем
+    recent_blockhash = scheduler.call(
+        RPC_ENDPOINT, LANE_BLOCKHASH, client.get_latest_blockhash, coalesce_key="getLatestBlockhash"
+    ).value.blockhash
+    txn = Transaction(recent_blockhash=recent_blockhash, fee_payer=owner)
+    txn.add(set_compute_unit_price(UNIT_PRICE))
+    txn.add(set_compute_unit_limit(priority_in_lamports))
+    if token_account_instructions:
+        txn.add(token_account_instructions)
+    txn.add(swap_instruction)
+    txn.add(
+        transfer(
+            TransferParams(
+                from_pubkey=owner,
+                to_pubkey=JITOTIP_ACCOUNT,
+                lamports=tip_in_lamports
+            )
+        )
+    )
+    txn.sign(payer_keypair)
+    return txn
 
-        # Получаем или создаём ATA
-        try:
-            account_data = client.get_token_accounts_by_owner(owner, TokenAccountOpts(mint))
-            token_account = account_data.value[0].pubkey
-            token_account_instructions = None
-        except:
-            token_account = get_associated_token_address(owner, mint)
-            token_account_instructions = create_associated_token_account(owner, owner, mint)
-
-        # Расчёт параметров свапа
-        virtual_sol_reserves = coin_data['virtual_sol_reserves']
-        virtual_token_reserves = coin_data['virtual_token_reserves']
-        sol_in_lamports = int(sol_in * LAMPORTS_PER_SOL)
-        amount = int(sol_in_lamports * virtual_token_reserves / virtual_sol_reserves)
-        print(f"Amount returned from buy: {amount}")
-
-        slippage_adjustment = 1 + (slippage / 100)
-        sol_in_with_slippage = sol_in * slippage_adjustment
-        max_sol_cost = int(sol_in_with_slippage * LAMPORTS_PER_SOL)
-        print("Max Sol Cost:", sol_in_with_slippage)
-        
-        # Настройка аккаунтов для инструкции
-        MINT = Pubkey.from_string(coin_data['mint'])
-        BONDING_CURVE = Pubkey.from_string(coin_data['bonding_curve'])
-        ASSOCIATED_BONDING_CURVE = Pubkey.from_string(coin_data['associated_bonding_curve'])
-        ASSOCIATED_USER = token_account
-        USER = owner
 
-        keys = [
-            AccountMeta(pubkey=GLOBAL, is_signer=False, is_writable=False),
-            AccountMeta(pubkey=FEE_RECIPIENT, is_signer=False, is_writable=True),
-            AccountMeta(pubkey=MINT, is_signer=False, is_writable=False),
-            AccountMeta(pubkey=BONDING_CURVE, is_signer=False, is_writable=True),
-            AccountMeta(pubkey=ASSOCIATED_BONDING_CURVE, is_signer=False, is_writable=True),
-            AccountMeta(pubkey=ASSOCIATED_USER, is_signer=False, is_writable=True),
-            AccountMeta(pubkey=USER, is_signer=True, is_writable=True),
-            AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
-            AccountMeta(pubkey=TOKEN_PROGRAM, is_signer=False, is_writable=False),
-            AccountMeta(pubkey=RENT, is_signer=False, is_writable=False),
-            AccountMeta(pubkey=EVENT_AUTHORITY, is_signer=False, is_writable=False),
-            AccountMeta(pubkey=PUMP_FUN_PROGRAM, is_signer=False, is_writable=False)
-        ]
+def buy(mint_str: str, sol_in: float = 0.01, slippage: int = 30, priority_in_lamports: int = 65000, coin_data: Optional[dict] = None, simulate: bool = False) -> bool:
+    try:
+        try:
+            txn = build_buy_txn(mint_str, sol_in, slippage, priority_in_lamports, coin_data)
+        except PreflightError as e:
+            print("Preflight failed:", e)
+            return False
 
-        # Формируем инструкцию свапа
-        data = bytearray()
-        data.extend(bytes.fromhex("66063d1201daebea"))
-        data.extend(struct.pack('<Q', amount))
-        data.extend(struct.pack('<Q', max_sol_cost))
-        data = bytes(data)
-        swap_instruction = Instruction(PUMP_FUN_PROGRAM, data, keys)
-
-        # Создаем транзакцию, подписываем
-        recent_blockhash = client.get_latest_blockhash().value.blockhash
-        txn = Transaction(recent_blockhash=recent_blockhash, fee_payer=owner)
-        txn.add(set_compute_unit_price(UNIT_PRICE))
-        txn.add(set_compute_unit_limit(priority_in_lamports))
-        if token_account_instructions:
-            txn.add(token_account_instructions)
-        txn.add(swap_instruction)
-        txn.add(
-    transfer(
-        TransferParams(
-            from_pubkey=owner,
-            to_pubkey=JITOTIP_ACCOUNT,
-            lamports=tip_in_lamports
-        )
-    )
-)
-        txn.sign(payer_keypair)
-        
-        # Сериализуем транзакцию и кодируем в base58 для Jito
-        signed_tx_bytes = txn.serialize()
-        signed_tx_base58 = base58.b58encode(signed_tx_bytes).decode('utf-8')
-
-        # Формируем запрос к Jito
-        jito_request_body = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "sendBundle",
-            "params": [[signed_tx_base58]]
-        }
+        if simulate:
+            ok, err = simulate_transactions([txn])[0]
+            if not ok:
+                print("Simulation failed:", err)
+                return False
 
         # Отправляем транзакцию в Jito Block Engine
-        response = requests.post(
-            "https://mainnet.block-engine.jito.wtf/api/v1/bundles",
-            json=jito_request_body,
-            headers={"Content-Type": "application/json"}
-        )
+        response = send_jito_bundle([txn])
 
         if response.status_code == 200:
             # Получаем сигнатуру транзакции из подписей
@@ -157,20 +169,26 @@ def sell(mint_str: str, priority_in_lamports : int = 50000 ,token_balance: Optio
         token_price = virtual_sol_reserves / virtual_token_reserves
         print(f"Token Price: {token_price:.20f} SOL")
 
+        # Raw balance of the wallet, None if there is no token account
+        wallet_balance = get_token_balance_lamports(mint_str)
         if token_balance == None:
-            token_balance = get_token_balance(mint_str)
-        print("Token Balance:", token_balance)    
-        if token_balance == 0 or token_balance is None:
+            amount = wallet_balance
+        else:
+            amount = ui_to_raw_amount(token_balance)
+        print("Token Balance:", amount / token_decimal if amount else amount)    
+        if amount == 0 or amount is None:
             print("Token Balance is None!")
             #Since there is nothign to sell we treat this like confirmation
             return True
 
-        # Calculate amount and min_sol_output
-        amount = int(token_balance * token_decimal)
-        sol_out = float(token_balance) * float(token_price)
-        slippage_adjustment = 1 - (slippage / 100)
-        sol_out_with_slippage = sol_out * slippage_adjustment
-        min_sol_output = int(sol_out_with_slippage * LAMPORTS_PER_SOL)
+        # Calculate amount and min_sol_output in base units
+        sol_out = amount * coin_data['virtual_sol_reserves'] // coin_data['virtual_token_reserves']
+        min_sol_output = sol_out * (100 - slippage) // 100
+
+        preflight_error = check_sell(coin_data, amount, min_sol_output, wallet_balance, close_token_account)
+        if preflight_error:
+            print("Preflight failed:", preflight_error)
+            return False
 
         MINT = Pubkey.from_string(coin_data['mint'])
         BONDING_CURVE = Pubkey.from_string(coin_data['bonding_curve'])
@@ -202,7 +220,9 @@ def sell(mint_str: str, priority_in_lamports : int = 50000 ,token_balance: Optio
         data = bytes(data)
         swap_instruction = Instruction(PUMP_FUN_PROGRAM, data, keys)
 
-        recent_blockhash = client.get_latest_blockhash().value.blockhash
+        recent_blockhash = scheduler.call(
+            RPC_ENDPOINT, LANE_BLOCKHASH, client.get_latest_blockhash, coalesce_key="getLatestBlockhash"
+        ).value.blockhash
         txn = Transaction(recent_blockhash=recent_blockhash, fee_payer=owner)
         txn.add(set_compute_unit_price(UNIT_PRICE))
         txn.add(set_compute_unit_limit(priority_in_lamports))
@@ -225,22 +245,8 @@ def sell(mint_str: str, priority_in_lamports : int = 50000 ,token_balance: Optio
 
         txn.sign(payer_keypair)
 
-        # Сериализация и отправка в Jito
-        signed_tx_bytes = txn.serialize()
-        signed_tx_base58 = base58.b58encode(signed_tx_bytes).decode('utf-8')
-
-        jito_request_body = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "sendBundle",
-            "params": [[signed_tx_base58]]
-        }
-
-        response = requests.post(
-            "https://mainnet.block-engine.jito.wtf/api/v1/bundles",
-            json=jito_request_body,
-            headers={"Content-Type": "application/json"}
-        )
+        # Отправка в Jito
+        response = send_jito_bundle([txn])
 
         if response.status_code == 200:
             signature = str(txn.signatures[0])
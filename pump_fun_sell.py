@@ -2,6 +2,7 @@ import requests
 import base58
 import struct
 import logging
+from decimal import Decimal
 from typing import Optional, Union
 
 from solana.transaction import AccountMeta, Transaction
@@ -14,8 +15,10 @@ from datetime import datetime
 
 from config import payer_keypair, client
 from constants import *
-from utils import get_token_balance
+from utils import get_token_balance_lamports, send_jito_bundle
 from coin_data import get_coin_data
+from preflight import PreflightError, check_sell, simulate_transactions, ui_to_raw_amount
+from scheduler import scheduler, RPC_ENDPOINT, LANE_BLOCKHASH
 from solders.system_program import TransferParams, transfer
 
 logging.basicConfig(
@@ -32,13 +35,148 @@ tip_in_sol = 0.00005
 tip_in_lamports = int(tip_in_sol * LAMPORTS_PER_SOL)
 owner = payer_keypair.pubkey()
 
+def build_sell_txn(
+    mint_str: str,
+    token_balance: Optional[Union[int, float]] = None,
+    close_token_account: bool = True,
+    sell_percentage: Optional[float] = None,
+    slippage: int = 30,
+    priority_in_lamports: int = 50000,
+    coin_data: Optional[dict] = None
+) -> Optional[Transaction]:
+    """
+    Собирает и подписывает транзакцию продажи через bonding curve.
+    Аргументы те же, что у `sell`.
+
+    Возвращает None, если продавать нечего. Бросает PreflightError, если
+    транзакция заведомо не пройдёт.
+    """
+    if coin_data is None:
+        coin_data = get_coin_data(mint_str)
+    if not coin_data:
+        raise PreflightError("не удалось получить данные о токене")
+    logger.debug(f"Данные о токене: {coin_data}")
+    if coin_data['complete']:
+        raise PreflightError("bonding curve завершена, продавайте через jupiter.sell или router.trade")
+
+    owner = payer_keypair.pubkey()
+    mint = Pubkey.from_string(mint_str)
+    logger.debug(f"Owner Pubkey: {owner}, Mint Pubkey: {mint}")
+
+    token_account = get_associated_token_address(owner, mint)
+    logger.debug(f"Associated Token Account: {token_account}")
+
+    sol_decimal = 10**9
+    token_decimal = 10**6
+    virtual_sol_reserves = coin_data['virtual_sol_reserves'] / sol_decimal
+    virtual_token_reserves = coin_data['virtual_token_reserves'] / token_decimal
+    if virtual_token_reserves == 0:
+        raise PreflightError("virtual_token_reserves = 0, деление на ноль невозможно")
+    
+    token_price = virtual_sol_reserves / virtual_token_reserves
+    logger.info(f"Цена токена (примерная): {token_price:.20f} SOL")
+
+    # Все количества считаем в целых base units, без float-округления.
+    # Реальный баланс кошелька читаем всегда: None - ATA нет, ошибка чтения - исключение.
+    wallet_balance = get_token_balance_lamports(mint_str)
+    # Если пользователь не передал token_balance, проверяем sell_percentage:
+    if token_balance is None:
+        if wallet_balance is None or wallet_balance == 0:
+            logger.warning("Token Balance is None or 0, нечего продавать.")
+            return None
+        # Если указали sell_percentage, продаём % от общего баланса
+        if sell_percentage is not None and sell_percentage > 0:
+            amount = int(wallet_balance * Decimal(str(sell_percentage)) / 100)
+            if amount <= 0:
+                logger.warning(f"Рассчитанное количество для продажи = {amount}, отменяем.")
+                return None
+        else:
+            # Иначе продаём весь баланс
+            amount = wallet_balance
+    else:
+        # Если передан token_balance явно, продаём ровно это количество
+        # (sell_percentage игнорируем)
+        amount = ui_to_raw_amount(token_balance)
+
+    print("Token Balance:", amount / token_decimal)
+    if amount == 0:
+        print("Token Balance is None!")
+        return None
+    
+    sol_out = amount * coin_data['virtual_sol_reserves'] // coin_data['virtual_token_reserves']
+    min_sol_output = sol_out * (100 - slippage) // 100
+    logger.debug(f"amount={amount}, sol_out={sol_out}, min_sol_output={min_sol_output}")
+
+    preflight_error = check_sell(coin_data, amount, min_sol_output, wallet_balance, close_token_account)
+    if preflight_error:
+        raise PreflightError(preflight_error)
+
+    MINT = Pubkey.from_string(coin_data['mint'])
+    BONDING_CURVE = Pubkey.from_string(coin_data['bonding_curve'])
+    ASSOCIATED_BONDING_CURVE = Pubkey.from_string(coin_data['associated_bonding_curve'])
+    ASSOCIATED_USER = token_account
+    USER = owner
+    
+    keys = [
+        AccountMeta(pubkey=GLOBAL, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=FEE_RECIPIENT, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=MINT, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=BONDING_CURVE, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=ASSOCIATED_BONDING_CURVE, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=ASSOCIATED_USER, is_signer=False, is_writable=True),
+        AccountMeta(pubkey=USER, is_signer=True, is_writable=True),
+        AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=ASSOC_TOKEN_ACC_PROG, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=TOKEN_PROGRAM, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=EVENT_AUTHORITY, is_signer=False, is_writable=False),
+        AccountMeta(pubkey=PUMP_FUN_PROGRAM, is_signer=False, is_writable=False)
+    ]
+
+    data = bytearray()
+    # Код инструкции продажи (swap) - меняется в зависимости от вашей программы
+    data.extend(bytes.fromhex("33e685a4017f83ad"))
+    data.extend(struct.pack('<Q', amount))
+    data.extend(struct.pack('<Q', min_sol_output))
+    data = bytes(data)
+    swap_instruction = Instruction(PUMP_FUN_PROGRAM, data, keys)
+
+    recent_blockhash = scheduler.call(
+        RPC_ENDPOINT, LANE_BLOCKHASH, client.get_latest_blockhash, coalesce_key="getLatestBlockhash"
+    ).value.blockhash
+    txn = Transaction(recent_blockhash=recent_blockhash, fee_payer=owner)
+    txn.add(set_compute_unit_price(UNIT_PRICE))
+    txn.add(set_compute_unit_limit(priority_in_lamports))
+    txn.add(swap_instruction)
+
+    if close_token_account:
+        # Закрываем счёт после полной продажи
+        close_account_instructions = close_account(CloseAccountParams(TOKEN_PROGRAM, token_account, owner, owner))
+        txn.add(close_account_instructions)
+
+    # Чаевые jito
+    txn.add(
+        transfer(
+            TransferParams(
+                from_pubkey=owner,
+                to_pubkey=JITOTIP_ACCOUNT,
+                lamports=tip_in_lamports
+            )
+        )
+    )
+
+    txn.sign(payer_keypair)
+    return txn
+
+
 def sell(
     mint_str: str,
     token_balance: Optional[Union[int, float]] = None,
     close_token_account: bool = True,
     sell_percentage: Optional[float] = None,
     slippage: int = 30,
-    priority_in_lamports: int = 50000
+    priority_in_lamports: int = 50000,
+    coin_data: Optional[dict] = None,
+    simulate: bool = False
 ) -> bool:
     """
     Продаёт токены с указанным mint.
@@ -54,6 +192,8 @@ def sell(
           будет у `token_balance`. 
       slippage (int): проскальзывание в %
       priority_in_lamports (int): приоритетная плата (compute unit)
+      coin_data (Optional[dict]): уже полученные данные get_coin_data. Если None, запрашиваются заново.
+      simulate (bool): прогнать транзакцию через simulateTransaction перед отправкой в Jito.
     """
     try:
         logger.debug("Начало функции sell")
@@ -61,128 +201,25 @@ def sell(
                      f"sell_percentage={sell_percentage}, close_token_account={close_token_account}, "
                      f"slippage={slippage}, priority_in_lamports={priority_in_lamports}")
 
-        coin_data = get_coin_data(mint_str)
-        if not coin_data:
-            logger.error("Не удалось получить данные о токене.")
-            return False
-        logger.debug(f"Данные о токене: {coin_data}")
-
-        owner = payer_keypair.pubkey()
-        mint = Pubkey.from_string(mint_str)
-        logger.debug(f"Owner Pubkey: {owner}, Mint Pubkey: {mint}")
-
-        token_account = get_associated_token_address(owner, mint)
-        logger.debug(f"Associated Token Account: {token_account}")
-
-        sol_decimal = 10**9
-        token_decimal = 10**6
-        virtual_sol_reserves = coin_data['virtual_sol_reserves'] / sol_decimal
-        virtual_token_reserves = coin_data['virtual_token_reserves'] / token_decimal
-        if virtual_token_reserves == 0:
-            logger.error("virtual_token_reserves = 0, деление на ноль невозможно.")
+        try:
+            txn = build_sell_txn(
+                mint_str, token_balance, close_token_account, sell_percentage,
+                slippage, priority_in_lamports, coin_data
+            )
+        except PreflightError as e:
+            logger.error(f"Preflight не пройден: {e}")
             return False
-        
-        token_price = virtual_sol_reserves / virtual_token_reserves
-        logger.info(f"Цена токена (примерная): {token_price:.20f} SOL")
-
-        # Если пользователь не передал token_balance, проверяем sell_percentage:
-        if token_balance is None:
-            wallet_balance = get_token_balance(mint_str)  # Всего токенов на кошельке
-            if wallet_balance is None or wallet_balance == 0:
-                logger.warning("Token Balance is None or 0, нечего продавать.")
-                return True
-            # Если указали sell_percentage, продаём % от общего баланса
-            if sell_percentage is not None and sell_percentage > 0:
-                token_balance = int(wallet_balance * (sell_percentage / 100.0))
-                if token_balance <= 0:
-                    logger.warning(f"Рассчитанное количество для продажи = {token_balance}, отменяем.")
-                    return True
-            else:
-                # Иначе продаём весь баланс
-                token_balance = wallet_balance
-        else:
-            # Если передан token_balance явно, продаём ровно это количество
-            # (sell_percentage игнорируем)
-            pass
-
-        print("Token Balance:", token_balance)
-        if token_balance == 0 or token_balance is None:
-            print("Token Balance is None!")
+        if txn is None:
+            # Продавать нечего, считаем это подтверждением
             return True
-        
-        amount = int(token_balance * token_decimal)
-        sol_out = float(token_balance) * float(token_price)
-        slippage_adjustment = 1 - (slippage / 100)
-        sol_out_with_slippage = sol_out * slippage_adjustment
-        min_sol_output = int(sol_out_with_slippage * LAMPORTS_PER_SOL)
-        logger.debug(f"amount={amount}, sol_out={sol_out}, min_sol_output={min_sol_output}")
-
-        MINT = Pubkey.from_string(coin_data['mint'])
-        BONDING_CURVE = Pubkey.from_string(coin_data['bonding_curve'])
-        ASSOCIATED_BONDING_CURVE = Pubkey.from_string(coin_data['associated_bonding_curve'])
-        ASSOCIATED_USER = token_account
-        USER = owner
-        
-        keys = [
-            AccountMeta(pubkey=GLOBAL, is_signer=False, is_writable=False),
-            AccountMeta(pubkey=FEE_RECIPIENT, is_signer=False, is_writable=True),
-            AccountMeta(pubkey=MINT, is_signer=False, is_writable=False),
-            AccountMeta(pubkey=BONDING_CURVE, is_signer=False, is_writable=True),
-            AccountMeta(pubkey=ASSOCIATED_BONDING_CURVE, is_signer=False, is_writable=True),
-            AccountMeta(pubkey=ASSOCIATED_USER, is_signer=False, is_writable=True),
-            AccountMeta(pubkey=USER, is_signer=True, is_writable=True),
-            AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
-            AccountMeta(pubkey=ASSOC_TOKEN_ACC_PROG, is_signer=False, is_writable=False),
-            AccountMeta(pubkey=TOKEN_PROGRAM, is_signer=False, is_writable=False),
-            AccountMeta(pubkey=EVENT_AUTHORITY, is_signer=False, is_writable=False),
-            AccountMeta(pubkey=PUMP_FUN_PROGRAM, is_signer=False, is_writable=False)
-        ]
-
-        data = bytearray()
-        # Код инструкции продажи (swap) - меняется в зависимости от вашей программы
-        data.extend(bytes.fromhex("33e685a4017f83ad"))
-        data.extend(struct.pack('<Q', amount))
-        data.extend(struct.pack('<Q', min_sol_output))
-        data = bytes(data)
-        swap_instruction = Instruction(PUMP_FUN_PROGRAM, data, keys)
-
-        recent_blockhash = client.get_latest_blockhash().value.blockhash
-        txn = Transaction(recent_blockhash=recent_blockhash, fee_payer=owner)
-        txn.add(set_compute_unit_price(UNIT_PRICE))
-        txn.add(set_compute_unit_limit(priority_in_lamports))
-        txn.add(swap_instruction)
-
-        if close_token_account:
-            # Закрываем счёт после полной продажи
-            close_account_instructions = close_account(CloseAccountParams(TOKEN_PROGRAM, token_account, owner, owner))
-            txn.add(close_account_instructions)
-
-        # Чаевые jito
-        txn.add(
-            transfer(
-                TransferParams(
-                    from_pubkey=owner,
-                    to_pubkey=JITOTIP_ACCOUNT,
-                    lamports=tip_in_lamports
-                )
-            )
-        )
 
-        txn.sign(payer_keypair)
-        signed_tx_bytes = txn.serialize()
-        signed_tx_base58 = base58.b58encode(signed_tx_bytes).decode('utf-8')
-
-        jito_request_body = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "sendBundle",
-            "params": [[signed_tx_base58]]
-        }
-        response = requests.post(
-            "https://mainnet.block-engine.jito.wtf/api/v1/bundles",
-            json=jito_request_body,
-            headers={"Content-Type": "application/json"},
-        )
+        if simulate:
+            ok, err = simulate_transactions([txn])[0]
+            if not ok:
+                logger.error(f"Симуляция транзакции не прошла: {err}")
+                return False
+
+        response = send_jito_bundle([txn])
 
         if response.status_code == 200:
             signature = str(txn.signatures[0])
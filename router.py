@@ -0,0 +1,218 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+
+import jupiter
+import pump_fun_buy
+import pump_fun_sell
+from coin_data import get_cached_coin_data, get_coin_data, get_many_coin_data
+from constants import INITIAL_REAL_TOKEN_RESERVES
+from preflight import PreflightError, simulate_transactions, ui_to_raw_amount
+from scheduler import SchedulerError
+from utils import get_token_balance_lamports, send_jito_bundle
+
+# Curves with less than this share of their real token reserves left get a
+# Jupiter quote prefetched in parallel with the curve refresh.
+GRADUATION_PREFETCH_THRESHOLD = 0.1
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="router")
+
+
+def is_near_graduation(coin_data: Optional[dict]) -> bool:
+    if coin_data is None:
+        return False
+    if coin_data["complete"]:
+        return True
+    real_token_reserves = coin_data.get("real_token_reserves")
+    if real_token_reserves is None:
+        return False
+    return real_token_reserves <= INITIAL_REAL_TOKEN_RESERVES * GRADUATION_PREFETCH_THRESHOLD
+
+
+def _jupiter_amount(mint_str: str, side: str, sol_in: float, sell_percentage: float) -> Optional[int]:
+    if side == "buy":
+        return ui_to_raw_amount(sol_in, 9)
+    token_balance = get_token_balance_lamports(mint_str)
+    if not token_balance:
+        return None
+    return int(token_balance * sell_percentage // 100)
+
+
+def _prefetch_quote(mint_str: str, side: str, sol_in: float, sell_percentage: float, slippage_bps: int):
+    amount = _jupiter_amount(mint_str, side, sol_in, sell_percentage)
+    if not amount:
+        return None
+    if side == "buy":
+        quote = jupiter.get_quote(jupiter.SOL, mint_str, amount, slippage_bps)
+    else:
+        quote = jupiter.get_quote(mint_str, jupiter.SOL, amount, slippage_bps)
+    return amount, quote
+
+
+def _trade_jupiter(mint_str: str, side: str, sol_in: float, sell_percentage: float,
+                   slippage: int, prefetch: Optional[Future]) -> bool:
+    slippage_bps = slippage * 100
+    try:
+        prefetched = prefetch.result() if prefetch is not None else None
+        if prefetched is None:
+            amount = _jupiter_amount(mint_str, side, sol_in, sell_percentage)
+            quote = None
+        else:
+            amount, quote = prefetched
+    except SchedulerError as e:
+        print(f"Failed to prepare Jupiter swap: {e}")
+        return False
+    if not amount:
+        print("No token balance available to sell.")
+        return False
+
+    try:
+        if side == "buy":
+            return jupiter.swap(jupiter.SOL, mint_str, amount, slippage_bps, quote_response=quote)
+        return jupiter.swap(mint_str, jupiter.SOL, amount, slippage_bps, quote_response=quote)
+    except SchedulerError as e:
+        print(f"Jupiter swap failed: {e}")
+        return False
+
+
+def _check_order(side: str, sell_percentage: Optional[float]) -> Optional[str]:
+    """Return None if the order is valid, otherwise the reason it is not."""
+    if side not in ("buy", "sell"):
+        return f"unknown trade side: {side}"
+    if sell_percentage is not None and not (0 < sell_percentage <= 100):
+        return "sell percentage must be between 0 and 100"
+    return None
+
+
+def trade(
+    mint_str: str,
+    side: str,
+    sol_in: float = 0.01,
+    sell_percentage: Optional[float] = None,
+    slippage: int = 30,
+    jupiter_slippage: int = 5,
+    close_token_account: bool = True,
+) -> bool:
+    """
+    Buy or sell a token through the bonding curve or, once the curve is
+    complete, through Jupiter.
+
+    The route is picked from the cached curve state. For curves close to
+    graduation the Jupiter quote is fetched in parallel with the curve refresh,
+    so switching to Jupiter costs no extra round trip.
+    """
+    order_error = _check_order(side, sell_percentage)
+    if order_error:
+        print(f"Invalid order: {order_error}")
+        return False
+    if sell_percentage is None:
+        sell_percentage = 100
+
+    cached = get_cached_coin_data(mint_str)
+    if cached is not None and cached["complete"]:
+        return _trade_jupiter(mint_str, side, sol_in, sell_percentage, jupiter_slippage, None)
+
+    prefetch = None
+    if is_near_graduation(cached):
+        prefetch = _executor.submit(_prefetch_quote, mint_str, side, sol_in, sell_percentage, jupiter_slippage * 100)
+
+    try:
+        coin_data = get_coin_data(mint_str)
+    except SchedulerError as e:
+        print(f"Failed to retrieve coin data: {e}")
+        return False
+    if not coin_data:
+        print("Failed to retrieve coin data...")
+        return False
+
+    if coin_data["complete"]:
+        print("Bonding curve is complete, routing through Jupiter")
+        return _trade_jupiter(mint_str, side, sol_in, sell_percentage, jupiter_slippage, prefetch)
+
+    if side == "buy":
+        return pump_fun_buy.buy(mint_str, sol_in=sol_in, slippage=slippage, coin_data=coin_data)
+    return pump_fun_sell.sell(
+        mint_str,
+        close_token_account=close_token_account and sell_percentage == 100,
+        sell_percentage=sell_percentage if sell_percentage < 100 else None,
+        slippage=slippage,
+        coin_data=coin_data,
+    )
+
+
+def submit_orders(orders: List[dict]) -> List[bool]:
+    """
+    Submit many orders (router.trade keyword arguments) at once.
+
+    Bonding curve orders are built and signed up front, simulated together in
+    one batched request, and only the ones that pass are sent to Jito, each
+    in its own bundle. Orders on completed curves go through trade() one by
+    one. Returns one result per order, in order.
+    """
+    results = [False] * len(orders)
+    try:
+        coin_datas = get_many_coin_data(list({order["mint_str"] for order in orders}))
+    except Exception as e:
+        print(f"Failed to retrieve coin data: {e}")
+        return results
+
+    built = []
+    for i, order in enumerate(orders):
+        order_error = _check_order(order.get("side"), order.get("sell_percentage"))
+        if order_error:
+            print(f"Order {i} dropped: {order_error}")
+            continue
+        coin_data = coin_datas.get(order["mint_str"])
+        if coin_data is not None and coin_data["complete"]:
+            results[i] = trade(**order)
+            continue
+        try:
+            txn = _build_curve_txn(order, coin_data)
+        except Exception as e:
+            # A failure on one order must not cost the others their results.
+            print(f"Order {i} dropped before simulation: {e}")
+            continue
+        if txn is None:
+            # Nothing to sell, same as sell()
+            results[i] = True
+        else:
+            built.append((i, txn))
+
+    simulated = simulate_transactions([txn for _, txn in built])
+    for (i, txn), (ok, err) in zip(built, simulated):
+        if not ok:
+            print(f"Order {i} dropped, simulation failed: {err}")
+            continue
+        try:
+            response = send_jito_bundle([txn])
+        except Exception as e:
+            print(f"Order {i} not sent: {e}")
+            continue
+        if response.status_code == 200:
+            print(f"Order {i} sent, signature {txn.signatures[0]}")
+            results[i] = True
+        else:
+            print(f"Order {i} rejected by Jito: {response.status_code} {response.text}")
+    return results
+
+
+def _build_curve_txn(order: dict, coin_data: Optional[dict]):
+    if coin_data is None:
+        raise PreflightError("failed to retrieve coin data")
+    # Side and sell percentage were checked by _check_order.
+    if order["side"] == "buy":
+        return pump_fun_buy.build_buy_txn(
+            order["mint_str"],
+            sol_in=order.get("sol_in", 0.01),
+            slippage=order.get("slippage", 30),
+            coin_data=coin_data,
+        )
+    sell_percentage = order.get("sell_percentage")
+    if sell_percentage is None:
+        sell_percentage = 100
+    return pump_fun_sell.build_sell_txn(
+        order["mint_str"],
+        close_token_account=order.get("close_token_account", True) and sell_percentage == 100,
+        sell_percentage=sell_percentage if sell_percentage < 100 else None,
+        slippage=order.get("slippage", 30),
+        coin_data=coin_data,
+    )
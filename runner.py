@@ -0,0 +1,205 @@
+import multiprocessing as mp
+import os
+import queue
+import struct
+import threading
+import time
+import traceback
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional
+
+import router
+from coin_data import get_many_coin_data
+from scheduler import SchedulerError
+
+# One fixed-width record per mint slot:
+# seq, slot, virtual token/sol reserves, real token/sol reserves, total supply,
+# updated_at, complete, mint
+RECORD = struct.Struct("<QQQQQQQd?44s3x")
+SEQ = struct.Struct("<Q")
+READ_RETRIES = 100  # attempts before a record still being written is skipped for this pass
+
+
+class MarketState:
+    """
+    Curve states of a fixed list of mints in a shared memory block.
+
+    The ingest thread is the only writer. Each record is guarded by a
+    sequence counter that is odd while the record is being written, so
+    readers in other processes can detect and retry torn reads.
+    """
+
+    def __init__(self, mints: List[str], name: Optional[str] = None):
+        self.mints = list(mints)
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(1, RECORD.size * len(self.mints)))
+            self.shm.buf[:] = bytes(self.shm.size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+
+    def write(self, index: int, coin_data: dict) -> None:
+        offset = index * RECORD.size
+        seq = SEQ.unpack_from(self.shm.buf, offset)[0]
+        SEQ.pack_into(self.shm.buf, offset, seq + 1)
+        RECORD.pack_into(
+            self.shm.buf, offset,
+            seq + 1,
+            coin_data.get("slot") or 0,
+            coin_data["virtual_token_reserves"],
+            coin_data["virtual_sol_reserves"],
+            coin_data["real_token_reserves"],
+            coin_data.get("real_sol_reserves") or 0,
+            coin_data["token_total_supply"],
+            time.time(),
+            coin_data["complete"],
+            self.mints[index].encode(),
+        )
+        SEQ.pack_into(self.shm.buf, offset, seq + 2)
+
+    def read(self, index: int):
+        """
+        Return (seq, coin_data) for a slot, (seq, None) if it was never written,
+        or (None, None) if it stayed mid-write for READ_RETRIES attempts.
+        """
+        offset = index * RECORD.size
+        for _ in range(READ_RETRIES):
+            fields = RECORD.unpack_from(self.shm.buf, offset)
+            seq = fields[0]
+            if seq % 2 == 0 and SEQ.unpack_from(self.shm.buf, offset)[0] == seq:
+                break
+            time.sleep(0)  # let the writer finish
+        else:
+            return None, None
+        if seq == 0:
+            return seq, None
+        return seq, {
+            "mint": self.mints[index],
+            "slot": fields[1],
+            "virtual_token_reserves": fields[2],
+            "virtual_sol_reserves": fields[3],
+            "real_token_reserves": fields[4],
+            "real_sol_reserves": fields[5],
+            "token_total_supply": fields[6],
+            "updated_at": fields[7],
+            "complete": fields[8],
+        }
+
+    def close(self) -> None:
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _ingest(state: MarketState, stop: threading.Event, poll_interval: float) -> None:
+    index = {mint_str: i for i, mint_str in enumerate(state.mints)}
+    last = {}
+    while not stop.is_set():
+        started = time.monotonic()
+        try:
+            for mint_str, coin_data in get_many_coin_data(state.mints).items():
+                if coin_data is None:
+                    continue
+                reserves = (coin_data["virtual_token_reserves"], coin_data["virtual_sol_reserves"], coin_data["complete"])
+                if last.get(mint_str) != reserves:
+                    # Workers only re-evaluate a mint when its curve moved.
+                    last[mint_str] = reserves
+                    state.write(index[mint_str], coin_data)
+        except SchedulerError as e:
+            print(f"Ingest throttled: {e}")
+        except Exception:
+            # Keep polling: a dead ingest thread would stop the runner.
+            print("Ingest failed:")
+            traceback.print_exc()
+        stop.wait(max(0.0, poll_interval - (time.monotonic() - started)))
+
+
+def _shard(worker_id: int, workers: int, count: int) -> range:
+    """Indexes of the mints owned by one worker."""
+    return range(worker_id, count, workers)
+
+
+def _worker(worker_id: int, workers: int, mints: List[str], shm_name: str, strategy: Callable,
+            orders, stop, poll_interval: float) -> None:
+    state = MarketState(mints, shm_name)
+    shard = _shard(worker_id, workers, len(mints))
+    seen = {i: 0 for i in shard}
+    try:
+        while not stop.is_set():
+            for i in shard:
+                seq, coin_data = state.read(i)
+                if seq == seen[i] or coin_data is None:
+                    continue
+                seen[i] = seq
+                try:
+                    order = strategy(coin_data)
+                except Exception as e:
+                    print(f"Strategy failed on {coin_data['mint']}: {e}")
+                    continue
+                if order:
+                    orders.put(order)
+            stop.wait(poll_interval)
+    finally:
+        state.close()
+
+
+def run(
+    mints: List[str],
+    strategy: Callable[[dict], Optional[dict]],
+    workers: Optional[int] = None,
+    ingest_interval: float = 1.0,
+    poll_interval: float = 0.05,
+) -> None:
+    """
+    Track `mints` with a single ingest thread and evaluate `strategy` on them
+    in `workers` processes, each owning a shard of the mints.
+
+    Ingest and order submission share this process, and with it one request
+    scheduler, so curve polling can never push trades over the RPC rate limit.
+
+    `strategy` must be a module level function: it gets the coin data of a
+    mint whenever its curve changes and returns None or an order, i.e. the
+    keyword arguments of router.trade (mint_str, side, ...). Orders from all
+    workers are submitted here, one at a time.
+    """
+    workers = workers or max(1, (os.cpu_count() or 2) - 1)
+    state = MarketState(mints)
+    stop = mp.Event()
+    orders = mp.Queue()
+    processes = [
+        mp.Process(target=_worker, args=(i, workers, mints, state.name, strategy, orders, stop, poll_interval),
+                   name=f"worker-{i}")
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    # Started after the workers, so they are not forked from a process with a live ingest thread.
+    ingest_stop = threading.Event()
+    ingest = threading.Thread(target=_ingest, args=(state, ingest_stop, ingest_interval), name="ingest", daemon=True)
+    ingest.start()
+
+    try:
+        while ingest.is_alive() and all(process.is_alive() for process in processes):
+            try:
+                order = orders.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            print("Submitting order:", order)
+            print("Order result:", router.trade(**order))
+        if not ingest.is_alive():
+            print("Ingest thread stopped, shutting down")
+        for process in processes:
+            if not process.is_alive():
+                print(f"{process.name} exited with code {process.exitcode}, shutting down")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        ingest_stop.set()
+        ingest.join(timeout=5)
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        state.close()
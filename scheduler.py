@@ -0,0 +1,195 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import requests
+
+# Priority lanes, lower runs first.
+LANE_SUBMIT = 0
+LANE_BLOCKHASH = 1
+LANE_CURVE = 2
+LANE_BALANCE = 3
+
+RPC_ENDPOINT = "rpc"
+JUPITER_ENDPOINT = "jupiter"
+JITO_ENDPOINT = "jito"
+
+# (requests per second, burst) per endpoint
+ENDPOINT_LIMITS = {
+    RPC_ENDPOINT: (10.0, 20),
+    JUPITER_ENDPOINT: (5.0, 5),
+    JITO_ENDPOINT: (5.0, 5),
+}
+
+SUBMIT_RESERVE = 1  # tokens other lanes leave in the bucket for submissions
+MAX_RETRIES = 3
+BASE_BACKOFF = 0.5  # seconds
+MAX_BACKOFF = 8.0
+
+
+class SchedulerError(Exception):
+    pass
+
+
+class RateLimitedError(SchedulerError):
+    def __init__(self, endpoint: str, retry_after: Optional[float] = None):
+        hint = f" (retry after {retry_after}s)" if retry_after is not None else ""
+        super().__init__(f"{endpoint} is rate limiting requests{hint}")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class RequestError(SchedulerError):
+    pass
+
+
+class _RetryAfter(Exception):
+    def __init__(self, retry_after: Optional[float]):
+        self.retry_after = retry_after
+
+
+def _retry_after(response) -> Optional[float]:
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _rate_limit_of(exc: BaseException):
+    """Return the Retry-After hint (or True) if the exception chain is a 429, else None."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, _RetryAfter):
+            return exc.retry_after or True
+        response = getattr(exc, "response", None)
+        if getattr(response, "status_code", None) == 429:
+            return _retry_after(response) or True
+        if "Too Many Requests" in str(exc):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+class _Endpoint:
+    """Token bucket shared by all lanes; waiters are served strictly by lane."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.cond = threading.Condition()
+        self.waiting = []
+        self.seq = itertools.count()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, lane: int) -> None:
+        reserve = 0 if lane == LANE_SUBMIT else min(SUBMIT_RESERVE, self.burst - 1)
+        with self.cond:
+            entry = (lane, next(self.seq))
+            heapq.heappush(self.waiting, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self.waiting[0] == entry and now >= self.blocked_until and self.tokens >= 1 + reserve:
+                        self.tokens -= 1
+                        return
+                    wait = max(self.blocked_until - now, (1 + reserve - self.tokens) / self.rate, 0.001)
+                    self.cond.wait(wait)
+            finally:
+                self.waiting.remove(entry)
+                heapq.heapify(self.waiting)
+                self.cond.notify_all()
+
+    def back_off(self, delay: float) -> None:
+        with self.cond:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+            self.tokens = 0.0
+            self.cond.notify_all()
+
+
+class Scheduler:
+    """
+    Central gate for outgoing RPC, Jupiter and Jito requests.
+
+    Every request takes a token from its endpoint's bucket, higher priority
+    lanes go first, identical in-flight reads share one request, and 429s
+    pause the endpoint with exponential backoff before surfacing as
+    RateLimitedError.
+    """
+
+    def __init__(self, limits: Dict[str, tuple] = ENDPOINT_LIMITS):
+        self._endpoints = {name: _Endpoint(rate, burst) for name, (rate, burst) in limits.items()}
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, endpoint: str, rate: float, burst: int) -> None:
+        self._endpoints[endpoint] = _Endpoint(rate, burst)
+
+    def call(self, endpoint: str, lane: int, fn: Callable[..., Any], *args,
+             coalesce_key: Optional[Hashable] = None, **kwargs) -> Any:
+        if coalesce_key is None:
+            return self._run(endpoint, lane, fn, args, kwargs)
+
+        key = (endpoint, coalesce_key)
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._run(endpoint, lane, fn, args, kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def post(self, endpoint: str, lane: int, url: str, coalesce_key: Optional[Hashable] = None, **kwargs) -> requests.Response:
+        return self.call(endpoint, lane, self._send, "POST", url, coalesce_key=coalesce_key, **kwargs)
+
+    def get(self, endpoint: str, lane: int, url: str, coalesce_key: Optional[Hashable] = None, **kwargs) -> requests.Response:
+        return self.call(endpoint, lane, self._send, "GET", url, coalesce_key=coalesce_key, **kwargs)
+
+    @staticmethod
+    def _send(method: str, url: str, **kwargs) -> requests.Response:
+        response = requests.request(method, url, **kwargs)
+        if response.status_code == 429:
+            raise _RetryAfter(_retry_after(response))
+        return response
+
+    def _run(self, endpoint: str, lane: int, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        bucket = self._endpoints[endpoint]
+        for attempt in range(MAX_RETRIES + 1):
+            bucket.acquire(lane)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                rate_limit = _rate_limit_of(e)
+                if rate_limit is None:
+                    raise
+                retry_after = rate_limit if rate_limit is not True else None
+                if attempt == MAX_RETRIES:
+                    raise RateLimitedError(endpoint, retry_after) from e
+                delay = retry_after or min(MAX_BACKOFF, BASE_BACKOFF * 2 ** attempt) * (1 + random.random() / 2)
+                bucket.back_off(delay)
+
+
+scheduler = Scheduler()
@@ -0,0 +1,19 @@
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from solana.rpc.api import Client
+    from solders.keypair import Keypair  # type: ignore
+except ImportError:
+    pass
+else:
+    # config.py needs a real private key; tests run with a throwaway one.
+    config = types.ModuleType("config")
+    config.PRIV_KEY = ""
+    config.RPC = "http://127.0.0.1:8899"
+    config.client = Client(config.RPC)
+    config.payer_keypair = Keypair()
+    sys.modules.setdefault("config", config)
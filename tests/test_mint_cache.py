@@ -0,0 +1,85 @@
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+from mint_cache import MintCache
+
+
+def test_record_without_accounts_does_not_block_batch(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = MintCache(path)
+    cache.update("M1", slot=5)
+    cache.update("M2", bonding_curve="bc", associated_bonding_curve="abc", slot=1)
+    cache.flush()
+
+    assert MintCache(path).get("M2")["bonding_curve"] == "bc"
+    assert MintCache(path).get("M1") is None
+    assert not cache._dirty
+
+
+def test_older_slot_does_not_overwrite_reserves(tmp_path):
+    cache = MintCache(str(tmp_path / "cache.sqlite3"))
+    cache.update("M", bonding_curve="bc", associated_bonding_curve="abc", slot=10, virtual_sol_reserves=2, complete=True)
+    cache.update("M", slot=3, virtual_sol_reserves=1, complete=False)
+
+    record = cache.get("M")
+    assert record["slot"] == 10
+    assert record["virtual_sol_reserves"] == 2
+    assert record["complete"] is True
+
+
+def test_concurrent_flushes_keep_latest_record(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = MintCache(path)
+    for slot in range(1, 50):
+        cache.update("M", bonding_curve="bc", associated_bonding_curve="abc", slot=slot)
+        threads = [threading.Thread(target=cache.flush) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert MintCache(path).get("M")["slot"] == 49
+
+
+def test_stale_row_from_other_process_does_not_overwrite(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    ingest = MintCache(path)
+    submitter = MintCache(path)
+    submitter.update("M", bonding_curve="bc", associated_bonding_curve="abc", slot=5, virtual_sol_reserves=1)
+    ingest.update("M", bonding_curve="bc", associated_bonding_curve="abc", slot=9, virtual_sol_reserves=2, complete=True)
+    ingest.flush()
+    submitter.flush()
+
+    record = MintCache(path).get("M")
+    assert record["slot"] == 9
+    assert record["virtual_sol_reserves"] == 2
+    assert record["complete"] is True
+
+
+def _update_in_child(cache, path):
+    # Must neither hang on state inherited from the parent's writer nor touch the file.
+    cache.update("CHILD", bonding_curve="bc", associated_bonding_curve="abc", slot=1)
+    cache.flush()
+    ok = cache.get("CHILD") is not None and cache.get("PARENT") is not None and cache._writer is None
+    os._exit(0 if ok else 1)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_child_keeps_cache_in_memory(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = MintCache(path, flush_interval=0)
+    ctx = multiprocessing.get_context("fork")
+    for slot in range(1, 21):
+        # Fork while the writer is busy flushing the parent's updates.
+        cache.update("PARENT", bonding_curve="bc", associated_bonding_curve="abc", slot=slot)
+        child = ctx.Process(target=_update_in_child, args=(cache, path))
+        child.start()
+        child.join(10)
+        assert child.exitcode == 0
+
+    cache.flush()
+    assert MintCache(path).get("CHILD") is None
+    assert MintCache(path).get("PARENT")["slot"] == 20
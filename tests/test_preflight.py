@@ -0,0 +1,143 @@
+import pytest
+
+pytest.importorskip("solana")
+
+import preflight  # noqa: E402
+import pump_fun_buy  # noqa: E402
+import pump_fun_sell  # noqa: E402
+from scheduler import RequestError  # noqa: E402
+
+MINT = "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P"
+COIN_DATA = {
+    "mint": MINT,
+    "bonding_curve": "4wTV1YmiEkRvAtNtsSGPtUrqRYQMe5SKy2uB4Jjaxnjf",
+    "associated_bonding_curve": "CebN5WGQ4jvEPvsVU4EoHEpgzq1VV7AbicfhtW4xC9iM",
+    "virtual_token_reserves": 1_073_000_000_000_000,
+    "virtual_sol_reserves": 30_000_000_000,
+    "real_token_reserves": 793_100_000_000_000,
+    "real_sol_reserves": 0,
+    "token_total_supply": 1_000_000_000_000_000,
+    "complete": False,
+    "slot": 1,
+}
+
+
+def test_ui_to_raw_amount_is_exact():
+    assert preflight.ui_to_raw_amount(0.1, 9) == 100_000_000
+    assert preflight.ui_to_raw_amount(1.000001) == 1_000_001
+
+
+def test_check_sell_missing_account():
+    assert preflight.check_sell(COIN_DATA, 1_000_000, 0, None) == "token account does not exist"
+
+
+def test_check_sell_amount_above_balance():
+    assert "exceeds token balance" in preflight.check_sell(COIN_DATA, 2_000_000, 0, 1_000_000)
+
+
+def test_check_sell_close_after_partial_sell():
+    reason = preflight.check_sell(COIN_DATA, 500_000, 0, 1_000_000, close_token_account=True)
+    assert "closed" in reason
+
+
+def test_check_sell_min_output():
+    assert "below min sol output" in preflight.check_sell(COIN_DATA, 1_000_000, 10**9, 1_000_000)
+    assert preflight.check_sell(COIN_DATA, 1_000_000, 0, 1_000_000, close_token_account=True) is None
+
+
+def test_check_buy_max_cost():
+    amount = 100_000_000 * COIN_DATA["virtual_token_reserves"] // COIN_DATA["virtual_sol_reserves"]
+    assert preflight.check_buy(COIN_DATA, amount, 130_000_000) is None
+    assert "exceeds max sol cost" in preflight.check_buy(COIN_DATA, amount, 100_000_000)
+
+
+def _sell(monkeypatch, wallet_balance, **kwargs):
+    def balance(_mint_str):
+        if isinstance(wallet_balance, Exception):
+            raise wallet_balance
+        return wallet_balance
+
+    monkeypatch.setattr(pump_fun_sell, "get_token_balance_lamports", balance)
+    monkeypatch.setattr(pump_fun_sell, "send_jito_bundle", lambda txns: pytest.fail("must not send"))
+    return pump_fun_sell.sell(MINT, coin_data=COIN_DATA, **kwargs)
+
+
+def test_sell_explicit_amount_without_account(monkeypatch):
+    assert _sell(monkeypatch, None, token_balance=1) is False
+
+
+def test_sell_explicit_amount_above_balance(monkeypatch):
+    assert _sell(monkeypatch, 500_000, token_balance=1) is False
+
+
+def test_sell_explicit_partial_amount_with_close(monkeypatch):
+    assert _sell(monkeypatch, 2_000_000, token_balance=1) is False
+
+
+def test_sell_nothing_to_sell(monkeypatch):
+    assert _sell(monkeypatch, None) is True
+    assert _sell(monkeypatch, 0) is True
+
+
+def test_sell_balance_read_failure(monkeypatch):
+    assert _sell(monkeypatch, RequestError("timeout")) is False
+
+
+def test_legacy_sell_explicit_amount_without_account(monkeypatch):
+    monkeypatch.setattr(pump_fun_buy, "get_coin_data", lambda _mint_str: COIN_DATA)
+    monkeypatch.setattr(pump_fun_buy, "get_token_balance_lamports", lambda _mint_str: None)
+    assert pump_fun_buy.sell(MINT, token_balance=1) is False
+
+
+def test_legacy_sell_balance_read_failure(monkeypatch):
+    def balance(_mint_str):
+        raise RequestError("timeout")
+
+    monkeypatch.setattr(pump_fun_buy, "get_coin_data", lambda _mint_str: COIN_DATA)
+    monkeypatch.setattr(pump_fun_buy, "get_token_balance_lamports", balance)
+    assert pump_fun_buy.sell(MINT) is False
+
+
+def test_check_buy_sol_balance_covers_cost_and_rent():
+    amount = 100_000_000 * COIN_DATA["virtual_token_reserves"] // COIN_DATA["virtual_sol_reserves"]
+    assert preflight.check_buy(COIN_DATA, amount, 130_000_000, sol_balance=130_000_000) is None
+    reason = preflight.check_buy(COIN_DATA, amount, 130_000_000, creates_token_account=True, sol_balance=130_000_000)
+    assert "sol balance" in reason
+
+
+class FakeScheduler:
+    """Answers the RPC calls of build_buy_txn / legacy sell without a network."""
+
+    class Reply:
+        def __init__(self, value):
+            self.value = value
+
+    def call(self, endpoint, lane, fn, *args, **kwargs):
+        name = getattr(fn, "__name__", "")
+        if name == "get_token_accounts_by_owner":
+            return self.Reply([])
+        if name == "get_latest_blockhash":
+            from solders.hash import Hash  # type: ignore
+            return self.Reply(type("Blockhash", (), {"blockhash": Hash.default()})())
+        raise AssertionError(f"unexpected call {name}")
+
+
+def test_build_buy_txn_checks_sol_balance(monkeypatch):
+    monkeypatch.setattr(pump_fun_buy, "scheduler", FakeScheduler())
+    monkeypatch.setattr(pump_fun_buy, "get_sol_balance_lamports", lambda: 50_000_000)
+    with pytest.raises(preflight.PreflightError, match="sol balance"):
+        pump_fun_buy.build_buy_txn(MINT, sol_in=0.1, coin_data=COIN_DATA)
+
+    monkeypatch.setattr(pump_fun_buy, "get_sol_balance_lamports", lambda: 10**9)
+    assert pump_fun_buy.build_buy_txn(MINT, sol_in=0.1, coin_data=COIN_DATA) is not None
+
+
+def test_legacy_sell_sends_through_jito_bundle(monkeypatch):
+    sent = []
+    monkeypatch.setattr(pump_fun_buy, "scheduler", FakeScheduler())
+    monkeypatch.setattr(pump_fun_buy, "get_coin_data", lambda _mint_str: COIN_DATA)
+    monkeypatch.setattr(pump_fun_buy, "get_token_balance_lamports", lambda _mint_str: 1_000_000)
+    monkeypatch.setattr(pump_fun_buy, "send_jito_bundle",
+                        lambda txns: sent.append(txns) or type("Response", (), {"status_code": 200})())
+    assert pump_fun_buy.sell(MINT) is True
+    assert len(sent) == 1 and len(sent[0]) == 1
@@ -0,0 +1,124 @@
+import pytest
+
+pytest.importorskip("solana")
+
+import jupiter  # noqa: E402
+import pump_fun_buy  # noqa: E402
+import pump_fun_sell  # noqa: E402
+import router  # noqa: E402
+
+MINT = "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P"
+OPEN = {
+    "mint": MINT,
+    "virtual_token_reserves": 1_073_000_000_000_000,
+    "virtual_sol_reserves": 30_000_000_000,
+    "real_token_reserves": 793_100_000_000_000,
+    "complete": False,
+}
+NEAR_GRADUATION = dict(OPEN, real_token_reserves=10_000_000_000_000)
+COMPLETE = dict(OPEN, real_token_reserves=0, complete=True)
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def record(name, result=True):
+        def fn(*args, **kwargs):
+            calls.append((name, args, kwargs))
+            return result
+        return fn
+
+    monkeypatch.setattr(router, "get_cached_coin_data", lambda _mint_str: None)
+    monkeypatch.setattr(router, "get_coin_data", lambda _mint_str: pytest.fail("must not read the curve"))
+    monkeypatch.setattr(router, "get_token_balance_lamports", lambda _mint_str: 1_000_000)
+    monkeypatch.setattr(jupiter, "get_quote", record("get_quote", {"quote": 1}))
+    monkeypatch.setattr(jupiter, "swap", record("swap"))
+    monkeypatch.setattr(pump_fun_buy, "buy", record("curve_buy"))
+    monkeypatch.setattr(pump_fun_sell, "sell", record("curve_sell"))
+    return calls
+
+
+def test_complete_cache_goes_to_jupiter_without_curve_read(monkeypatch, calls):
+    monkeypatch.setattr(router, "get_cached_coin_data", lambda _mint_str: COMPLETE)
+
+    assert router.trade(MINT, "buy", sol_in=0.1) is True
+    (name, args, kwargs), = calls
+    assert name == "swap"
+    assert args == (jupiter.SOL, MINT, 100_000_000, 500)
+    assert kwargs == {"quote_response": None}
+
+
+def test_graduated_curve_reuses_prefetched_quote(monkeypatch, calls):
+    monkeypatch.setattr(router, "get_cached_coin_data", lambda _mint_str: NEAR_GRADUATION)
+    monkeypatch.setattr(router, "get_coin_data", lambda _mint_str: COMPLETE)
+
+    assert router.trade(MINT, "sell", sell_percentage=50) is True
+    assert [name for name, _, _ in calls] == ["get_quote", "swap"]
+    _, args, kwargs = calls[1]
+    assert args == (MINT, jupiter.SOL, 500_000, 500)
+    assert kwargs == {"quote_response": {"quote": 1}}
+
+
+def test_open_curve_buys_on_curve(monkeypatch, calls):
+    monkeypatch.setattr(router, "get_coin_data", lambda _mint_str: OPEN)
+
+    assert router.trade(MINT, "buy", sol_in=0.1, slippage=10) is True
+    (name, args, kwargs), = calls
+    assert name == "curve_buy"
+    assert kwargs == {"sol_in": 0.1, "slippage": 10, "coin_data": OPEN}
+
+
+@pytest.mark.parametrize("sell_percentage, close, passed_percentage", [
+    (None, True, None),
+    (100, True, None),
+    (50, False, 50),
+])
+def test_open_curve_sell_closes_account_only_on_full_sell(monkeypatch, calls, sell_percentage, close, passed_percentage):
+    monkeypatch.setattr(router, "get_coin_data", lambda _mint_str: OPEN)
+
+    assert router.trade(MINT, "sell", sell_percentage=sell_percentage) is True
+    (name, _, kwargs), = calls
+    assert name == "curve_sell"
+    assert kwargs["close_token_account"] is close
+    assert kwargs["sell_percentage"] == passed_percentage
+
+
+@pytest.mark.parametrize("sell_percentage", [0, -10, 150])
+def test_trade_rejects_bad_sell_percentage(calls, sell_percentage):
+    assert router.trade(MINT, "sell", sell_percentage=sell_percentage) is False
+    assert calls == []
+
+
+def _submit(monkeypatch, orders, build_sell=None, build_buy=None):
+    monkeypatch.setattr(router, "get_many_coin_data", lambda mint_strs: {mint_str: OPEN for mint_str in mint_strs})
+    monkeypatch.setattr(pump_fun_sell, "build_sell_txn", build_sell or (lambda *a, **k: pytest.fail("must not build")))
+    monkeypatch.setattr(pump_fun_buy, "build_buy_txn", build_buy or (lambda *a, **k: pytest.fail("must not build")))
+    monkeypatch.setattr(router, "simulate_transactions", lambda txns: [(True, None) for _ in txns])
+    monkeypatch.setattr(router, "send_jito_bundle", lambda txns: type("Response", (), {"status_code": 200})())
+    return router.submit_orders(orders)
+
+
+@pytest.mark.parametrize("sell_percentage", [0, -10, 150])
+def test_submit_orders_rejects_bad_sell_percentage(monkeypatch, sell_percentage):
+    assert _submit(monkeypatch, [{"mint_str": MINT, "side": "sell", "sell_percentage": sell_percentage}]) == [False]
+
+
+def test_submit_orders_rejects_unknown_side(monkeypatch):
+    assert _submit(monkeypatch, [{"mint_str": MINT, "side": "hold"}]) == [False]
+
+
+def test_submit_orders_isolates_build_failures(monkeypatch):
+    class Txn:
+        signatures = ["sig"]
+
+    def build_buy(*args, **kwargs):
+        raise RuntimeError("getTokenAccountsByOwner timed out")
+
+    results = _submit(
+        monkeypatch,
+        [{"mint_str": MINT, "side": "buy"}, {"mint_str": MINT, "side": "sell", "sell_percentage": 50}],
+        build_sell=lambda *args, **kwargs: Txn(),
+        build_buy=build_buy,
+    )
+    assert results == [False, True]
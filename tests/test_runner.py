@@ -0,0 +1,112 @@
+import threading
+
+import pytest
+
+pytest.importorskip("solana")
+
+import runner  # noqa: E402
+from runner import RECORD, SEQ, MarketState  # noqa: E402
+
+MINTS = ["MintA", "MintB", "MintC"]
+COIN_DATA = {
+    "slot": 7,
+    "virtual_token_reserves": 1_073_000_000_000_000,
+    "virtual_sol_reserves": 30_000_000_000,
+    "real_token_reserves": 793_100_000_000_000,
+    "real_sol_reserves": 0,
+    "token_total_supply": 1_000_000_000_000_000,
+    "complete": False,
+}
+
+
+@pytest.fixture
+def state():
+    state = MarketState(MINTS)
+    yield state
+    state.close()
+
+
+def test_write_then_read(state):
+    assert state.read(1) == (0, None)
+
+    state.write(1, COIN_DATA)
+    seq, coin_data = state.read(1)
+    assert seq == 2
+    assert coin_data["mint"] == "MintB"
+    assert {k: coin_data[k] for k in COIN_DATA} == COIN_DATA
+
+    state.write(1, dict(COIN_DATA, complete=True))
+    seq, coin_data = state.read(1)
+    assert seq == 4
+    assert coin_data["complete"] is True
+    assert state.read(0) == (0, None)
+
+
+def test_attached_reader_sees_writes(state):
+    state.write(2, COIN_DATA)
+    reader = MarketState(MINTS, state.name)
+    try:
+        assert reader.read(2)[1]["virtual_sol_reserves"] == COIN_DATA["virtual_sol_reserves"]
+    finally:
+        reader.close()
+
+
+def test_record_stuck_mid_write_is_skipped(state):
+    state.write(0, COIN_DATA)
+    SEQ.pack_into(state.shm.buf, 0, 3)  # writer died between the two sequence bumps
+    assert state.read(0) == (None, None)
+
+
+class TearingRecord:
+    """Lands a full write between a reader's unpack and its sequence check."""
+
+    def __init__(self, state, index):
+        self.state = state
+        self.index = index
+        self.size = RECORD.size
+        self.torn = False
+
+    def pack_into(self, *args):
+        return RECORD.pack_into(*args)
+
+    def unpack_from(self, buf, offset):
+        fields = RECORD.unpack_from(buf, offset)
+        if not self.torn:
+            self.torn = True
+            self.state.write(self.index, dict(COIN_DATA, slot=8))
+        return fields
+
+
+def test_torn_read_is_retried(monkeypatch, state):
+    state.write(0, COIN_DATA)
+    monkeypatch.setattr(runner, "RECORD", TearingRecord(state, 0))
+
+    seq, coin_data = state.read(0)
+    assert seq == 4
+    assert coin_data["slot"] == 8
+
+
+@pytest.mark.parametrize("count, workers", [(0, 3), (1, 4), (10, 3), (12, 4), (7, 7)])
+def test_shards_are_disjoint_and_cover_every_mint(count, workers):
+    shards = [set(runner._shard(worker_id, workers, count)) for worker_id in range(workers)]
+    assert sum(len(shard) for shard in shards) == count
+    assert set().union(*shards) == set(range(count))
+
+
+def test_ingest_survives_unexpected_errors(monkeypatch, state):
+    stop = threading.Event()
+    rounds = []
+
+    def get_many_coin_data(mint_strs):
+        rounds.append(1)
+        if len(rounds) == 1:
+            raise RuntimeError("httpx read timeout")
+        stop.set()
+        return {"MintA": COIN_DATA, "MintB": None}
+
+    monkeypatch.setattr(runner, "get_many_coin_data", get_many_coin_data)
+    runner._ingest(state, stop, poll_interval=0)
+
+    assert len(rounds) == 2
+    assert state.read(0)[1]["slot"] == 7
+    assert state.read(1) == (0, None)
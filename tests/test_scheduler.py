@@ -0,0 +1,171 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+import scheduler  # noqa: E402
+from scheduler import LANE_BALANCE, LANE_CURVE, LANE_SUBMIT, RateLimitedError, Scheduler, _Endpoint, _RetryAfter  # noqa: E402
+
+
+def _start(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def _release(endpoint, tokens):
+    with endpoint.cond:
+        endpoint.tokens = tokens
+        endpoint.cond.notify_all()
+
+
+def test_bucket_refills_up_to_burst(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(scheduler.time, "monotonic", lambda: now[0])
+    endpoint = _Endpoint(rate=10.0, burst=2)
+    endpoint.acquire(LANE_SUBMIT)
+    endpoint.acquire(LANE_SUBMIT)
+    assert endpoint.tokens == 0
+
+    now[0] += 0.1
+    endpoint._refill(now[0])
+    assert endpoint.tokens == pytest.approx(1.0)
+
+    now[0] += 10
+    endpoint._refill(now[0])
+    assert endpoint.tokens == 2
+
+
+def test_other_lanes_leave_reserve_for_submissions():
+    endpoint = _Endpoint(rate=0.001, burst=2)
+    endpoint.acquire(LANE_CURVE)
+
+    curve = _start(endpoint.acquire, LANE_CURVE)
+    curve.join(0.1)
+    assert curve.is_alive()
+
+    endpoint.acquire(LANE_SUBMIT)  # takes the reserved token right away
+    _release(endpoint, 2)
+    curve.join(2)
+    assert not curve.is_alive()
+
+
+def test_waiters_are_served_by_lane():
+    endpoint = _Endpoint(rate=0.001, burst=3)
+    endpoint.tokens = 0
+    served = []
+
+    def acquire(lane):
+        endpoint.acquire(lane)
+        served.append(lane)
+
+    threads = [_start(acquire, LANE_BALANCE)]
+    _wait_for(lambda: len(endpoint.waiting) == 1)
+    threads.append(_start(acquire, LANE_CURVE))
+    _wait_for(lambda: len(endpoint.waiting) == 2)
+
+    _release(endpoint, 2)  # one token above the reserve
+    _wait_for(lambda: served == [LANE_CURVE])
+    _release(endpoint, 2)
+    _wait_for(lambda: served == [LANE_CURVE, LANE_BALANCE])
+    for thread in threads:
+        thread.join(2)
+
+
+def test_identical_inflight_calls_are_coalesced():
+    sched = Scheduler({"x": (100.0, 100)})
+    entered = threading.Event()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def fetch():
+        calls.append(1)
+        entered.set()
+        release.wait(2)
+        return "reserves"
+
+    def call():
+        results.append(sched.call("x", LANE_CURVE, fetch, coalesce_key="curve"))
+
+    threads = [_start(call)]
+    assert entered.wait(2)
+    threads.append(_start(call))
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+
+    assert calls == [1]
+    assert results == ["reserves", "reserves"]
+    assert sched._inflight == {}
+
+
+def test_429_backs_off_and_retries(monkeypatch):
+    monkeypatch.setattr(scheduler, "BASE_BACKOFF", 0.001)
+    sched = Scheduler({"x": (1000.0, 10)})
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise _RetryAfter(None)
+        return "ok"
+
+    assert sched.call("x", LANE_CURVE, flaky) == "ok"
+    assert len(attempts) == 3
+
+
+def test_429_honours_retry_after():
+    sched = Scheduler({"x": (1000.0, 10)})
+    attempts = []
+
+    def flaky():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise _RetryAfter(0.05)
+        return "ok"
+
+    assert sched.call("x", LANE_CURVE, flaky) == "ok"
+    assert attempts[1] - attempts[0] >= 0.05
+
+
+def test_persistent_429_raises_rate_limited(monkeypatch):
+    monkeypatch.setattr(scheduler, "BASE_BACKOFF", 0.001)
+    sched = Scheduler({"x": (1000.0, 10)})
+    attempts = []
+
+    def limited(retry_after=None):
+        attempts.append(1)
+        raise _RetryAfter(retry_after)
+
+    with pytest.raises(RateLimitedError) as info:
+        sched.call("x", LANE_CURVE, limited)
+    assert len(attempts) == scheduler.MAX_RETRIES + 1
+    assert info.value.retry_after is None
+    assert str(info.value) == "x is rate limiting requests"
+
+    with pytest.raises(RateLimitedError, match=r"retry after 0\.001s"):
+        sched.call("x", LANE_CURVE, limited, 0.001)
+
+
+def test_other_errors_are_not_retried():
+    sched = Scheduler({"x": (1000.0, 10)})
+    attempts = []
+
+    def broken():
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        sched.call("x", LANE_CURVE, broken)
+    assert attempts == [1]
@@ -0,0 +1,84 @@
+import pytest
+
+pytest.importorskip("solana")
+
+import requests  # noqa: E402
+
+import utils  # noqa: E402
+from scheduler import RequestError  # noqa: E402
+
+MINT = "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P"
+
+
+class FakeResponse:
+    def __init__(self, body, status_code=200):
+        self.body = body
+        self.status_code = status_code
+        self.text = str(body)
+
+    def json(self):
+        if isinstance(self.body, Exception):
+            raise self.body
+        return self.body
+
+
+def _accounts(*amounts):
+    return {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "result": {
+            "context": {"slot": 1},
+            "value": [
+                {"account": {"data": {"parsed": {"info": {"tokenAmount": {
+                    "amount": str(amount), "decimals": 6, "uiAmountString": str(amount / 10**6),
+                }}}}}}
+                for amount in amounts
+            ],
+        },
+    }
+
+
+def _post(monkeypatch, result):
+    def post(*args, **kwargs):
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(utils.scheduler, "post", post)
+
+
+def test_balance(monkeypatch):
+    _post(monkeypatch, FakeResponse(_accounts(1_500_000)))
+    assert utils.get_token_balance_lamports(MINT) == 1_500_000
+    assert utils.get_token_balance(MINT) == 1.5
+
+
+def test_balance_without_token_account(monkeypatch):
+    _post(monkeypatch, FakeResponse(_accounts()))
+    assert utils.get_token_balance_lamports(MINT) is None
+    assert utils.get_token_balance(MINT) is None
+
+
+@pytest.mark.parametrize("result", [
+    requests.ConnectionError("connection refused"),
+    requests.Timeout("timed out"),
+    FakeResponse("busy", status_code=503),
+    FakeResponse(ValueError("not json")),
+    FakeResponse({"jsonrpc": "2.0", "id": 1, "error": {"code": -32005, "message": "busy"}}),
+    FakeResponse({"jsonrpc": "2.0", "id": 1}),
+])
+def test_failed_read_raises(monkeypatch, result):
+    _post(monkeypatch, result)
+    with pytest.raises(RequestError):
+        utils.get_token_balance_lamports(MINT)
+    with pytest.raises(RequestError):
+        utils.get_token_balance(MINT)
+
+
+def test_sol_balance_read_failure_raises(monkeypatch):
+    def call(*args, **kwargs):
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(utils.scheduler, "call", call)
+    with pytest.raises(RequestError):
+        utils.get_sol_balance_lamports()
@@ -1,9 +1,11 @@
 import json
 import time
-from typing import Optional, Union
+from typing import List, Optional, Union
+import base58
 import requests
-from solana.transaction import Signature
+from solana.transaction import Signature, Transaction
 from config import RPC, client, payer_keypair
+from scheduler import scheduler, RequestError, SchedulerError, RPC_ENDPOINT, JITO_ENDPOINT, LANE_BALANCE, LANE_SUBMIT
 import aiohttp
 
 def find_data(data: Union[dict, list], field: str) -> Optional[str]:
@@ -22,34 +24,74 @@ def find_data(data: Union[dict, list], field: str) -> Optional[str]:
                 return result
     return None
 
-def get_token_balance_lamports(mint_str: str):
+def _get_token_accounts(mint_str: str) -> list:
+    """
+    Token accounts of the payer for the mint, as returned by getTokenAccountsByOwner.
+    An empty list means there is no token account; any failed read raises RequestError.
+    """
+    pubkey_str = str(payer_keypair.pubkey())
+    headers = {"accept": "application/json", "content-type": "application/json"}
+
+    payload = {
+        "id": 1,
+        "jsonrpc": "2.0",
+        "method": "getTokenAccountsByOwner",
+        "params": [
+            pubkey_str,
+            {"mint": mint_str},
+            {"encoding": "jsonParsed"}
+        ],
+    }
+
+    try:
+        response = scheduler.post(
+            RPC_ENDPOINT, LANE_BALANCE, RPC, json=payload, headers=headers,
+            coalesce_key=("getTokenAccountsByOwner", pubkey_str, mint_str)
+        )
+    except requests.RequestException as e:
+        raise RequestError(f"getTokenAccountsByOwner failed: {e}") from e
+    if response.status_code != 200:
+        raise RequestError(f"getTokenAccountsByOwner failed: {response.status_code} {response.text}")
     try:
-        pubkey_str = str(payer_keypair.pubkey())
-        headers = {"accept": "application/json", "content-type": "application/json"}
+        data = response.json()
+    except ValueError as e:
+        raise RequestError(f"getTokenAccountsByOwner returned invalid JSON: {e}") from e
+    if isinstance(data, dict) and "error" in data:
+        raise RequestError(f"getTokenAccountsByOwner failed: {data['error']}")
+    accounts = data.get("result", {}).get("value") if isinstance(data, dict) else None
+    if not isinstance(accounts, list):
+        raise RequestError(f"getTokenAccountsByOwner returned no account list: {data}")
+    return accounts
 
-        payload = {
-            "id": 1,
-            "jsonrpc": "2.0",
-            "method": "getTokenAccountsByOwner",
-            "params": [
-                pubkey_str,
-                {"mint": mint_str},
-                {"encoding": "jsonParsed"}
-            ],
-        }
-        
-        response = requests.post(RPC, json=payload, headers=headers)
-        ui_amount = find_data(response.json(), "amount")
-        return int(ui_amount)
-    except:
+def get_token_balance_lamports(mint_str: str) -> Optional[int]:
+    """Raw token balance, None if the wallet has no token account for the mint."""
+    accounts = _get_token_accounts(mint_str)
+    if not accounts:
         return None
+    amount = find_data(accounts, "amount")
+    try:
+        return int(amount)
+    except (TypeError, ValueError) as e:
+        raise RequestError(f"getTokenAccountsByOwner returned a bad amount: {amount}") from e
+
+def get_sol_balance_lamports() -> int:
+    """SOL balance of the payer in lamports; any failed read raises RequestError."""
+    try:
+        return scheduler.call(RPC_ENDPOINT, LANE_BALANCE, client.get_balance, payer_keypair.pubkey()).value
+    except SchedulerError:
+        raise
+    except Exception as e:
+        raise RequestError(f"getBalance failed: {e}") from e
     
 def confirm_txn(txn_sig: Signature, max_retries: int = 20, retry_interval: int = 3) -> bool:
     retries = 1
     
     while retries < max_retries:
         try:
-            txn_res = client.get_transaction(txn_sig, encoding="json", commitment="confirmed", max_supported_transaction_version=0)
+            txn_res = scheduler.call(
+                RPC_ENDPOINT, LANE_BALANCE, client.get_transaction,
+                txn_sig, encoding="json", commitment="confirmed", max_supported_transaction_version=0
+            )
             txn_json = json.loads(txn_res.value.transaction.meta.to_json())
             
             if txn_json['err'] is None:
@@ -70,27 +112,30 @@ def confirm_txn(txn_sig: Signature, max_retries: int = 20, retry_interval: int =
 
 
 
-def get_token_balance(mint_str: str):
+def get_token_balance(mint_str: str) -> Optional[float]:
+    """UI token balance, None if the wallet has no token account for the mint."""
+    accounts = _get_token_accounts(mint_str)
+    if not accounts:
+        return None
+    ui_amount = find_data(accounts, "uiAmountString")
+    print(ui_amount)
     try:
-        pubkey_str = str(payer_keypair.pubkey())
-        headers = {"accept": "application/json", "content-type": "application/json"}
-    
-        payload = {
-            "id": 1,
-            "jsonrpc": "2.0",
-            "method": "getTokenAccountsByOwner",
-            "params": [
-                pubkey_str,
-                {"mint": mint_str},
-                {"encoding": "jsonParsed"},
-            ],
-        }
-        
-        response = requests.post(RPC, json=payload, headers=headers)
-        ui_amount = find_data(response.json(), "uiAmount")
-        print(ui_amount)
         return float(ui_amount)
-    except Exception as e:
-        return None
+    except (TypeError, ValueError) as e:
+        raise RequestError(f"getTokenAccountsByOwner returned a bad amount: {ui_amount}") from e
 
 
+def send_jito_bundle(txns: List[Transaction]) -> requests.Response:
+    """Send signed transactions to the Jito Block Engine as one bundle."""
+    jito_request_body = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "sendBundle",
+        "params": [[base58.b58encode(txn.serialize()).decode('utf-8') for txn in txns]]
+    }
+    return scheduler.post(
+        JITO_ENDPOINT, LANE_SUBMIT,
+        "https://mainnet.block-engine.jito.wtf/api/v1/bundles",
+        json=jito_request_body,
+        headers={"Content-Type": "application/json"}
+    )